@@ -1,12 +1,22 @@
-from typing import Any, Dict, List, Optional
-
-from fastapi import FastAPI, HTTPException, Query
+import asyncio
+from contextlib import asynccontextmanager
+import heapq
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional
+
+import anyio
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from loguru import logger
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 import uvicorn
 
-from src.backend.crud import CandidateService, JobService
+from src.backend.cache import response_cache
+from src.backend.config import settings
+from src.backend.crud import CandidateService, JobService, MatchService
+from src.backend.database import get_db_manager
 from src.backend.similarity_engine import AdvancedSimilarityEngine
 
 
@@ -22,24 +32,66 @@ class MatchResponse(BaseModel):
     detailed_breakdown: Dict[str, Any]
 
 
+# Serializers built once and reused, skipping FastAPI's per-request response_model pass
+_RECORD_ADAPTER = TypeAdapter(Dict[str, Any])
+_MATCH_LIST_ADAPTER = TypeAdapter(List[MatchResponse])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the similarity engine and thread limiters once per worker at startup"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.API_THREAD_LIMIT
+    # Matching gets its own limiter so heavy scoring cannot starve the light endpoints
+    app.state.matching_limiter = anyio.CapacityLimiter(settings.MATCHING_THREAD_LIMIT)
+    app.state.similarity_engine = AdvancedSimilarityEngine()
+    yield
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Candidate Pool Management API",
     description="API for managing candidates, job descriptions, and candidate-job matching",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Add CORS middleware (the API is read-only, so only GET needs to be allowed)
+if settings.CORS_ALLOW_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ALLOW_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["GET"],
+        allow_headers=["authorization", "content-type"],
+    )
+
+
+def _cached_response(table: str, key: tuple, build: Callable[[], Any]) -> Any:
+    """Cached result of `build`, or build and cache it; runs in a worker thread
+
+    The key includes the write counter of the table the response reads, so writes from any
+    process (the ingest pipeline, other workers) are never served stale. A None result
+    (record not found) is not cached.
+    """
+    cache_key = (table, get_db_manager().table_version(table), *key)
+    value = response_cache.get(cache_key)
+    if value is None:
+        value = build()
+        if value is not None:
+            response_cache.set(cache_key, value)
+    return value
+
+
+def _dump_record(record: Optional[Dict[str, Any]]) -> Optional[bytes]:
+    return _RECORD_ADAPTER.dump_json(record) if record else None
+
 
-# Initialize similarity engine
-similarity_engine = AdvancedSimilarityEngine()
+def _json_rows_response(rows: List[str], stream: bool = False) -> Response:
+    """Ship rows already serialized by SQLite as a JSON array or an NDJSON stream"""
+    if stream:
+        return StreamingResponse((row + "\n" for row in rows), media_type="application/x-ndjson")
+    return Response(content="[" + ",".join(rows) + "]", media_type="application/json")
 
 
 @app.get("/")
@@ -61,6 +113,14 @@ async def get_all_candidates(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     search: Optional[str] = Query(None, description="Search term for filtering candidates"),
+    stream: bool = Query(False, description="Stream results as newline-delimited JSON"),
+    summary: bool = Query(False, description="Return only the summary fields of each record"),
+    after_created_at: Optional[str] = Query(
+        None, description="created_at of the last record of the previous page"
+    ),
+    after_id: Optional[int] = Query(
+        None, description="id of the last record of the previous page"
+    ),
 ) -> List[Dict[str, Any]]:
     """
     Retrieve all candidates with optional pagination and search
@@ -68,19 +128,39 @@ async def get_all_candidates(
     - **skip**: Number of records to skip (for pagination)
     - **limit**: Maximum number of records to return (1-1000)
     - **search**: Search term to filter candidates by name, email, position, or company
+    - **stream**: Return `application/x-ndjson`, one candidate per line
+    - **summary**: Return only the listing fields (name, email, position, company, experience)
+    - **after_created_at**, **after_id**: Keyset cursor, the `created_at` and `id` of the last
+      candidate already received; the page continues after it without an OFFSET scan
     """
     try:
-        logger.info(f"Fetching candidates: skip={skip}, limit={limit}, search={search}")
-
-        candidates = CandidateService.get_candidates(skip=skip, limit=limit, search_term=search)
+        logger.debug("Fetching candidates: skip={}, limit={}, search={}", skip, limit, search)
 
+        if (after_created_at is None) != (after_id is None):
+            raise HTTPException(
+                status_code=400, detail="after_created_at and after_id must be given together"
+            )
+        after = (after_created_at, after_id) if after_id is not None else None
+
+        candidates = await run_in_threadpool(
+            _cached_response,
+            "candidates",
+            ("list", skip, limit, search, summary, after),
+            lambda: (
+                CandidateService.get_candidates_json(
+                    skip=skip, limit=limit, search_term=search, summary=summary, after=after
+                )
+                or []
+            ),
+        )
         if not candidates:
-            logger.info("No candidates found")
-            return []
+            logger.debug("No candidates found")
 
-        logger.info(f"Retrieved {len(candidates)} candidates")
-        return candidates
+        logger.debug("Retrieved {} candidates", len(candidates))
+        return _json_rows_response(candidates, stream)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving candidates: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error retrieving candidates: {str(e)}")
@@ -94,17 +174,20 @@ async def get_candidate_by_id(candidate_id: int) -> Dict[str, Any] | None:
     - **candidate_id**: The ID of the candidate to retrieve
     """
     try:
-        logger.info(f"Fetching candidate with ID: {candidate_id}")
-
-        candidate = CandidateService.get_candidate_by_id(candidate_id)
+        logger.debug("Fetching candidate with ID: {}", candidate_id)
 
-        if not candidate:
+        content = await run_in_threadpool(
+            _cached_response,
+            "candidates",
+            ("detail", candidate_id),
+            lambda: _dump_record(CandidateService.get_candidate_by_id(candidate_id)),
+        )
+        if content is None:
             raise HTTPException(
                 status_code=404, detail=f"Candidate with ID {candidate_id} not found"
             )
 
-        logger.info(f"Retrieved candidate: {candidate.get('full_name')}")
-        return candidate
+        return Response(content=content, media_type="application/json")
 
     except HTTPException:
         raise
@@ -118,6 +201,14 @@ async def get_all_job_descriptions(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     search: Optional[str] = Query(None, description="Search term for filtering job descriptions"),
+    stream: bool = Query(False, description="Stream results as newline-delimited JSON"),
+    summary: bool = Query(False, description="Return only the summary fields of each record"),
+    after_created_at: Optional[str] = Query(
+        None, description="created_at of the last record of the previous page"
+    ),
+    after_id: Optional[int] = Query(
+        None, description="id of the last record of the previous page"
+    ),
 ) -> List[Dict[str, Any]]:
     """
     Retrieve all job descriptions with optional pagination and search
@@ -125,19 +216,41 @@ async def get_all_job_descriptions(
     - **skip**: Number of records to skip (for pagination)
     - **limit**: Maximum number of records to return (1-1000)
     - **search**: Search term to filter jobs by title, department, location, or summary
+    - **stream**: Return `application/x-ndjson`, one job description per line
+    - **summary**: Return only the listing fields (title, job ID, department, location, level)
+    - **after_created_at**, **after_id**: Keyset cursor, the `created_at` and `id` of the last
+      job description already received; the page continues after it without an OFFSET scan
     """
     try:
-        logger.info(f"Fetching job descriptions: skip={skip}, limit={limit}, search={search}")
-
-        jobs = JobService.get_jobs(skip=skip, limit=limit, search_term=search)
+        logger.debug(
+            "Fetching job descriptions: skip={}, limit={}, search={}", skip, limit, search
+        )
 
+        if (after_created_at is None) != (after_id is None):
+            raise HTTPException(
+                status_code=400, detail="after_created_at and after_id must be given together"
+            )
+        after = (after_created_at, after_id) if after_id is not None else None
+
+        jobs = await run_in_threadpool(
+            _cached_response,
+            "job_descriptions",
+            ("list", skip, limit, search, summary, after),
+            lambda: (
+                JobService.get_jobs_json(
+                    skip=skip, limit=limit, search_term=search, summary=summary, after=after
+                )
+                or []
+            ),
+        )
         if not jobs:
-            logger.info("No job descriptions found")
-            return []
+            logger.debug("No job descriptions found")
 
-        logger.info(f"Retrieved {len(jobs)} job descriptions")
-        return jobs
+        logger.debug("Retrieved {} job descriptions", len(jobs))
+        return _json_rows_response(jobs, stream)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving job descriptions: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error retrieving job descriptions: {str(e)}")
@@ -151,17 +264,20 @@ async def get_job_by_id(job_id: int) -> Dict[str, Any] | None:
     - **job_id**: The ID of the job description to retrieve
     """
     try:
-        logger.info(f"Fetching job description with ID: {job_id}")
-
-        job = JobService.get_job(job_id)
+        logger.debug("Fetching job description with ID: {}", job_id)
 
-        if not job:
+        content = await run_in_threadpool(
+            _cached_response,
+            "job_descriptions",
+            ("detail", job_id),
+            lambda: _dump_record(JobService.get_job(job_id)),
+        )
+        if content is None:
             raise HTTPException(
                 status_code=404, detail=f"Job description with ID {job_id} not found"
             )
 
-        logger.info(f"Retrieved job: {job.get('job_title')}")
-        return job
+        return Response(content=content, media_type="application/json")
 
     except HTTPException:
         raise
@@ -172,11 +288,13 @@ async def get_job_by_id(job_id: int) -> Dict[str, Any] | None:
 
 @app.get("/jobs/{job_id}/matching-candidates", response_model=List[MatchResponse])
 async def get_matching_candidates_for_job(
+    request: Request,
     job_id: int,
     min_score: float = Query(
         0.0, ge=0.0, le=1.0, description="Minimum similarity score threshold"
     ),
     limit: int = Query(50, ge=1, le=500, description="Maximum number of candidates to return"),
+    stream: bool = Query(False, description="Stream matches as newline-delimited JSON"),
 ) -> List[MatchResponse]:
     """
     Retrieve candidates that match a specific job description
@@ -184,52 +302,102 @@ async def get_matching_candidates_for_job(
     - **job_id**: The ID of the job description to match candidates against
     - **min_score**: Minimum similarity score threshold (0.0 to 1.0)
     - **limit**: Maximum number of matching candidates to return (1-500)
+    - **stream**: Return `application/x-ndjson`, one match per line, best first
     """
     try:
-        logger.info(f"Finding matching candidates for job ID: {job_id}, min_score: {min_score}")
+        logger.debug(
+            "Finding matching candidates for job ID: {}, min_score: {}", job_id, min_score
+        )
+        similarity_engine: AdvancedSimilarityEngine = request.app.state.similarity_engine
+        matching_limiter: anyio.CapacityLimiter = request.app.state.matching_limiter
 
-        job = JobService.get_job(job_id)
+        # The job and the candidate IDs come back from one statement, off the event loop.
+        # Only candidate IDs are loaded here; the scoring fields are fetched after shortlisting
+        job, candidate_ids = await run_in_threadpool(
+            MatchService.get_job_and_candidate_ids, job_id, 1000
+        )
         if not job:
             raise HTTPException(
                 status_code=404, detail=f"Job description with ID {job_id} not found"
             )
 
-        all_candidates = CandidateService.get_candidates(skip=0, limit=1000)
-
-        if not all_candidates:
-            logger.info("No candidates found in database")
-            return []
-
-        candidate_ids = [candidate["id"] for candidate in all_candidates]
-
-        logger.info(f"Calculating similarity scores for {len(candidate_ids)} candidates")
-        similarity_results = similarity_engine.calculate_similarity_batch(candidate_ids, job_id)
-
-        matching_candidates = []
-        for i, result in enumerate(similarity_results):
-            if result.overall_score >= min_score:
-                candidate = all_candidates[i]
-                matching_candidates.append(
-                    MatchResponse(
-                        candidate_id=candidate["id"],
-                        candidate_name=candidate.get("full_name"),
-                        overall_score=result.overall_score,
-                        skills_score=result.skills_score,
-                        experience_score=result.experience_score,
-                        education_score=result.education_score,
-                        semantic_similarity=result.semantic_similarity,
-                        seniority_match=result.seniority_match,
-                        detailed_breakdown=result.detailed_breakdown,
-                    )
+        if not candidate_ids:
+            logger.debug("No candidates found in database")
+            return _json_rows_response([], stream)
+
+        # Build (or revalidate) the cached job context once from the job row loaded above
+        await anyio.to_thread.run_sync(
+            similarity_engine.preprocess_job, job_id, job, limiter=matching_limiter
+        )
+
+        if settings.MATCHING_SHORTLIST_FACTOR > 0:
+            candidate_ids = await anyio.to_thread.run_sync(
+                similarity_engine.shortlist_candidates,
+                candidate_ids,
+                job_id,
+                limit * settings.MATCHING_SHORTLIST_FACTOR,
+                limiter=matching_limiter,
+            )
+
+        # One query loads every field the metrics need, so the engine never re-fetches
+        candidates = await run_in_threadpool(
+            CandidateService.get_candidates_with_similarity_fields, candidate_ids
+        )
+
+        logger.debug("Calculating similarity scores for {} candidates", len(candidates))
+        # Score independent chunks of the pool in parallel; the engine skips the embedding
+        # metrics for candidates that can no longer reach min_score
+        candidate_list = list(candidates.values())
+        chunk_size = settings.MATCHING_CHUNK_SIZE
+        chunk_results = await asyncio.gather(
+            *(
+                anyio.to_thread.run_sync(
+                    similarity_engine.calculate_similarity_batch_with_candidates,
+                    candidate_list[start : start + chunk_size],
+                    job_id,
+                    None,
+                    min_score,
+                    limiter=matching_limiter,
                 )
+                for start in range(0, len(candidate_list), chunk_size)
+            )
+        )
+        similarity_results = chain.from_iterable(chunk_results)
+
+        # Keep only the top `limit` scores above the threshold before building any responses;
+        # the chunk results are walked once, lazily, without flattening them into a new list
+        top_matches = heapq.nlargest(
+            limit,
+            (
+                (result.overall_score, candidate_id, result)
+                for candidate_id, result in zip(candidates, similarity_results)
+                if result.overall_score >= min_score
+            ),
+            key=lambda match: match[0],
+        )
 
-        matching_candidates.sort(key=lambda x: x.overall_score, reverse=True)
-        matching_candidates = matching_candidates[:limit]
+        # Both sides come from the database and the engine, so build the response
+        # without re-validating
+        matching_candidates = [
+            MatchResponse.model_construct(
+                candidate_id=candidate_id,
+                candidate_name=candidates[candidate_id].get("full_name"),
+                **dict(result),
+            )
+            for _, candidate_id, result in top_matches
+        ]
 
         logger.info(
-            f"Found {len(matching_candidates)} matching candidates above threshold {min_score}"
+            "Found {} matching candidates above threshold {}", len(matching_candidates), min_score
+        )
+        if stream:
+            return _json_rows_response(
+                [match.model_dump_json() for match in matching_candidates], stream
+            )
+        return Response(
+            content=_MATCH_LIST_ADAPTER.dump_json(matching_candidates),
+            media_type="application/json",
         )
-        return matching_candidates
 
     except HTTPException:
         raise
@@ -245,4 +413,14 @@ async def health_check():
 
 
 if __name__ == "__main__":
-    uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
+    # uvloop + httptools (from uvicorn[standard]) replace the stock asyncio loop and h11 parser;
+    # reload is incompatible with multiple workers, so it is left to `uvicorn --reload` in dev
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.API_WORKERS,
+        log_level="warning",
+    )
@@ -1,27 +1,72 @@
+import asyncio
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+import random
 import time
-from typing import List, Optional, Tuple
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from langchain_core.output_parsers import PydanticOutputParser
 from loguru import logger
 
 from src.backend.config import settings
-from src.backend.file_parser import GeminiParser
+from src.backend.file_parser import NO_DATA_RETURNED, GeminiParser, LLMRequestError
 from src.backend.models import (
     BatchProcessingStats,
     CVBatchData,
-    CVData,
+    FileInfo,
     JobBatchData,
-    JobData,
 )
 from src.backend.utils import (
     calculate_success_rate,
     create_batches,
     filter_supported_files,
     generate_session_id,
+    load_file_infos,
 )
 
+BatchResult = TypeVar("BatchResult", CVBatchData, JobBatchData)
+
+
+def _retry_delay(attempt: int, error: Optional[Exception]) -> float:
+    """Seconds to wait before retry `attempt`: the server's Retry-After when it sends one,
+    otherwise exponential backoff with full jitter so concurrent batches do not retry in step
+    """
+    # The parser wraps client errors in LLMRequestError; the original carries the headers
+    if isinstance(error, LLMRequestError) and error.__cause__ is not None:
+        error = error.__cause__
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = headers.get("Retry-After")
+    try:
+        if retry_after is not None:
+            return min(float(retry_after), settings.BATCH_RETRY_MAX_DELAY_SECONDS)
+    except (TypeError, ValueError):
+        pass
+
+    ceiling = settings.BATCH_RETRY_BACKOFF_SECONDS * settings.BATCH_RETRY_BACKOFF_BASE**attempt
+    return random.uniform(0, min(ceiling, settings.BATCH_RETRY_MAX_DELAY_SECONDS))
+
+
+@dataclass(frozen=True)
+class ParserStrategy(Generic[BatchResult]):
+    """Everything that differs between the CV and the job description pipelines"""
+
+    label: str
+    parse_batch: Callable[[List[Union[Path, FileInfo]]], Awaitable[BatchResult]]
+    # (batch_id, total_files, start_time, error_msg) -> result with every file failed
+    empty_result: Callable[[str, int, float, str], BatchResult]
+
 
 class BatchProcessor:
     """High-level batch processor for CVs and Job Descriptions"""
@@ -31,11 +76,19 @@ class BatchProcessor:
         model: str = settings.GEMINI_MODEL,
         temperature: float = settings.GEMINI_TEMPERATURE,
     ):
-        cv_parser = PydanticOutputParser(pydantic_object=CVData)
-        job_parser = PydanticOutputParser(pydantic_object=JobData)
+        self.cv_gemini_parser = GeminiParser(model, temperature)
+        self.job_gemini_parser = GeminiParser(model, temperature)
 
-        self.cv_gemini_parser = GeminiParser(cv_parser, model, temperature)
-        self.job_gemini_parser = GeminiParser(job_parser, model, temperature)
+        self.cv_strategy: ParserStrategy[CVBatchData] = ParserStrategy(
+            label="CV",
+            parse_batch=self.cv_gemini_parser.parse_cv_batch_async,
+            empty_result=self.cv_gemini_parser._create_empty_cv_batch_result,
+        )
+        self.job_strategy: ParserStrategy[JobBatchData] = ParserStrategy(
+            label="Job",
+            parse_batch=self.job_gemini_parser.parse_job_batch_async,
+            empty_result=self.job_gemini_parser._create_empty_job_batch_result,
+        )
 
         logger.info("BatchProcessor initialized with batch processing capabilities")
 
@@ -44,111 +97,132 @@ class BatchProcessor:
         file_paths: List[Path],
         batch_size: Optional[int] = None,
         max_size_mb: Optional[int] = None,
+        on_batch_complete: Optional[Callable[[CVBatchData], Awaitable[None]]] = None,
     ) -> Tuple[BatchProcessingStats, List[CVBatchData]]:
-        """
-        Process multiple CV files in batches
-
-        Args:
-            file_paths: List of CV file paths to process
-            batch_size: Number of files per batch (uses config default if None)
-            max_size_mb: Maximum total size per batch in MB (uses config default if None)
-            save_results: Whether to save individual results to files
-            output_dir: Directory to save results (uses config default if None)
-
-        Returns:
-            BatchProcessingStats with overall processing statistics
-        """
-        session_start_time = time.time()
-        session_id = generate_session_id()
-
-        batch_size = batch_size or settings.BATCH_SIZE_CV
-        max_size_mb = max_size_mb or settings.MAX_FILE_SIZE_MB
-
-        logger.info(f"Starting CV batch processing session: {session_id}")
-        logger.info(f"Processing {len(file_paths)} files with batch size {batch_size}")
-
-        supported_files = filter_supported_files(file_paths)
-        if len(supported_files) < len(file_paths):
-            logger.warning(
-                f"Filtered out {len(file_paths) - len(supported_files)} unsupported files"
-            )
-
-        if not supported_files:
-            logger.error("No supported files to process")
-            return self._create_empty_stats(session_id, session_start_time, "CV")
-
-        batches = create_batches(supported_files, batch_size, max_size_mb)
-        logger.info(f"Created {len(batches)} batches for processing")
-
-        all_batch_results: List[CVBatchData] = []
-        total_successful = 0
-        total_failed = 0
-
-        for i, batch_files in enumerate(batches, 1):
-            logger.info(f"Processing batch {i}/{len(batches)} with {len(batch_files)} files")
-
-            if i > 1 and settings.BATCH_DELAY_SECONDS > 0:
-                time.sleep(settings.BATCH_DELAY_SECONDS)
+        """Process multiple CV files in batches (blocking wrapper around aprocess_cv_files)"""
+        return asyncio.run(
+            self.aprocess_cv_files(file_paths, batch_size, max_size_mb, on_batch_complete)
+        )
 
-            batch_result = self._process_cv_batch_with_retry(batch_files)
-            all_batch_results.append(batch_result)
+    async def aprocess_cv_files(
+        self,
+        file_paths: List[Path],
+        batch_size: Optional[int] = None,
+        max_size_mb: Optional[int] = None,
+        on_batch_complete: Optional[Callable[[CVBatchData], Awaitable[None]]] = None,
+    ) -> Tuple[BatchProcessingStats, List[CVBatchData]]:
+        """Process multiple CV files in batches, with batches sent to the LLM concurrently"""
+        return await self._process_files(
+            file_paths,
+            self.cv_strategy,
+            batch_size or settings.BATCH_SIZE_CV,
+            max_size_mb,
+            on_batch_complete,
+        )
 
-            total_successful += batch_result.successful_parses
-            total_failed += batch_result.failed_parses
+    def process_job_files(
+        self,
+        file_paths: List[Path],
+        batch_size: Optional[int] = None,
+        max_size_mb: Optional[int] = None,
+        on_batch_complete: Optional[Callable[[JobBatchData], Awaitable[None]]] = None,
+    ) -> Tuple[BatchProcessingStats, List[JobBatchData]]:
+        """Process multiple job description files in batches (blocking wrapper)"""
+        return asyncio.run(
+            self.aprocess_job_files(file_paths, batch_size, max_size_mb, on_batch_complete)
+        )
 
-            logger.info(
-                f"Batch {i} completed: {batch_result.successful_parses}/{batch_result.total_files} successful"
-            )
+    async def aprocess_job_files(
+        self,
+        file_paths: List[Path],
+        batch_size: Optional[int] = None,
+        max_size_mb: Optional[int] = None,
+        on_batch_complete: Optional[Callable[[JobBatchData], Awaitable[None]]] = None,
+    ) -> Tuple[BatchProcessingStats, List[JobBatchData]]:
+        """Process multiple job description files in batches, with batches sent concurrently"""
+        return await self._process_files(
+            file_paths,
+            self.job_strategy,
+            batch_size or settings.BATCH_SIZE_JOB,
+            max_size_mb,
+            on_batch_complete,
+        )
 
-        session_end_time = time.time()
-        total_processing_time = session_end_time - session_start_time
+    def aiter_cv_batches(
+        self,
+        file_paths: List[Path],
+        batch_size: Optional[int] = None,
+        max_size_mb: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[BatchProcessingStats, CVBatchData]]:
+        """
+        Stream CV batch results as batches finish, each with the session statistics so far
 
-        stats = BatchProcessingStats(
-            session_id=session_id,
-            total_batches=len(batches),
-            total_files=len(supported_files),
-            total_successful=total_successful,
-            total_failed=total_failed,
-            total_processing_time_seconds=total_processing_time,
-            average_batch_size=len(supported_files) / len(batches) if batches else 0,
-            success_rate=calculate_success_rate(total_successful, len(supported_files)),
-            start_time=datetime.fromtimestamp(session_start_time).isoformat(),
-            end_time=datetime.fromtimestamp(session_end_time).isoformat(),
+        Preferred over process_cv_files for large sessions: every batch can be persisted and
+        dropped instead of keeping all parsed CVs in memory until the session ends.
+        """
+        return self._iter_files(
+            file_paths, self.cv_strategy, batch_size or settings.BATCH_SIZE_CV, max_size_mb
         )
 
-        logger.info(f"CV batch processing session {session_id} completed")
-        logger.info(
-            f"Overall success rate: {stats.success_rate:.1f}% ({total_successful}/{len(supported_files)})"
+    def aiter_job_batches(
+        self,
+        file_paths: List[Path],
+        batch_size: Optional[int] = None,
+        max_size_mb: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[BatchProcessingStats, JobBatchData]]:
+        """Stream job description batch results as batches finish (see aiter_cv_batches)"""
+        return self._iter_files(
+            file_paths, self.job_strategy, batch_size or settings.BATCH_SIZE_JOB, max_size_mb
         )
 
+    async def _process_files(
+        self,
+        file_paths: List[Path],
+        strategy: ParserStrategy[BatchResult],
+        batch_size: int,
+        max_size_mb: Optional[int] = None,
+        on_batch_complete: Optional[Callable[[BatchResult], Awaitable[None]]] = None,
+    ) -> Tuple[BatchProcessingStats, List[BatchResult]]:
+        """Process all batches of a session and collect their results in completion order"""
+        stats = None
+        all_batch_results: List[BatchResult] = []
+        async for stats, batch_result in self._iter_files(
+            file_paths, strategy, batch_size, max_size_mb, on_batch_complete
+        ):
+            all_batch_results.append(batch_result)
+
+        if stats is None:
+            stats = self._create_empty_stats(generate_session_id(), time.time(), strategy.label)
         return stats, all_batch_results
 
-    def process_job_files(
+    async def _iter_files(
         self,
         file_paths: List[Path],
-        batch_size: Optional[int] = None,
+        strategy: ParserStrategy[BatchResult],
+        batch_size: int,
         max_size_mb: Optional[int] = None,
-    ) -> Tuple[BatchProcessingStats, List[JobBatchData]]:
+        on_batch_complete: Optional[Callable[[BatchResult], Awaitable[None]]] = None,
+    ) -> AsyncIterator[Tuple[BatchProcessingStats, BatchResult]]:
         """
-        Process multiple job description files in batches
+        Process multiple files in batches, with batches sent to the LLM concurrently
 
         Args:
-            file_paths: List of job description file paths to process
-            batch_size: Number of files per batch (uses config default if None)
+            file_paths: List of file paths to process
+            strategy: Parser and result factory of the document type being processed
+            batch_size: Number of files per batch
             max_size_mb: Maximum total size per batch in MB (uses config default if None)
-            save_results: Whether to save individual results to files
-            output_dir: Directory to save results (uses config default if None)
+            on_batch_complete: Coroutine called with each batch result as soon as it is ready,
+                e.g. to save it while later batches are still being parsed
 
-        Returns:
-            BatchProcessingStats with overall processing statistics
+        Yields:
+            BatchProcessingStats of the session so far and the batch result, as batches finish
         """
         session_start_time = time.time()
         session_id = generate_session_id()
 
-        batch_size = batch_size or settings.BATCH_SIZE_JOB
         max_size_mb = max_size_mb or settings.MAX_FILE_SIZE_MB
 
-        logger.info(f"Starting Job batch processing session: {session_id}")
+        logger.info(f"Starting {strategy.label} batch processing session: {session_id}")
         logger.info(f"Processing {len(file_paths)} files with batch size {batch_size}")
 
         supported_files = filter_supported_files(file_paths)
@@ -159,98 +233,179 @@ class BatchProcessor:
 
         if not supported_files:
             logger.error("No supported files to process")
-            return self._create_empty_stats(session_id, session_start_time, "Job")
+            return
+
         batches = create_batches(supported_files, batch_size, max_size_mb)
         logger.info(f"Created {len(batches)} batches for processing")
+        if not batches:
+            logger.error("No batches to process")
+            return
 
-        all_batch_results: List[JobBatchData] = []
         total_successful = 0
         total_failed = 0
-
-        for i, batch_files in enumerate(batches, 1):
-            logger.info(f"Processing batch {i}/{len(batches)} with {len(batch_files)} files")
-
-            if i > 1 and settings.BATCH_DELAY_SECONDS > 0:
-                time.sleep(settings.BATCH_DELAY_SECONDS)
-
-            batch_result = self._process_job_batch_with_retry(batch_files)
-            all_batch_results.append(batch_result)
-
+        async for batch_result in self._iter_batches(
+            batches,
+            lambda batch_files: self._process_batch_with_retry(strategy, batch_files),
+            on_batch_complete,
+        ):
             total_successful += batch_result.successful_parses
             total_failed += batch_result.failed_parses
-
-            logger.info(
-                f"Batch {i} completed: {batch_result.successful_parses}/{batch_result.total_files} successful"
+            session_end_time = time.time()
+
+            stats = BatchProcessingStats(
+                session_id=session_id,
+                total_batches=len(batches),
+                total_files=len(supported_files),
+                total_successful=total_successful,
+                total_failed=total_failed,
+                total_processing_time_seconds=session_end_time - session_start_time,
+                average_batch_size=len(supported_files) / len(batches),
+                success_rate=calculate_success_rate(total_successful, len(supported_files)),
+                start_time=datetime.fromtimestamp(session_start_time).isoformat(),
+                end_time=datetime.fromtimestamp(session_end_time).isoformat(),
             )
+            yield stats, batch_result
 
-        session_end_time = time.time()
-        total_processing_time = session_end_time - session_start_time
-
-        stats = BatchProcessingStats(
-            session_id=session_id,
-            total_batches=len(batches),
-            total_files=len(supported_files),
-            total_successful=total_successful,
-            total_failed=total_failed,
-            total_processing_time_seconds=total_processing_time,
-            average_batch_size=len(supported_files) / len(batches) if batches else 0,
-            success_rate=calculate_success_rate(total_successful, len(supported_files)),
-            start_time=datetime.fromtimestamp(session_start_time).isoformat(),
-            end_time=datetime.fromtimestamp(session_end_time).isoformat(),
-        )
-
-        logger.info(f"Job batch processing session {session_id} completed")
+        logger.info(f"{strategy.label} batch processing session {session_id} completed")
         logger.info(
             f"Overall success rate: {stats.success_rate:.1f}% ({total_successful}/{len(supported_files)})"
         )
 
-        return stats, all_batch_results
+    async def _iter_batches(
+        self,
+        batches: List[List[Path]],
+        process_batch: Callable[[List[Path]], Awaitable[BatchResult]],
+        on_batch_complete: Optional[Callable[[BatchResult], Awaitable[None]]] = None,
+    ) -> AsyncIterator[BatchResult]:
+        """Process batches concurrently on the event loop, yielding results as they finish"""
+        semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+        delay_seconds = settings.BATCH_DELAY_SECONDS
+
+        async def run(i: int, batch_files: List[Path]) -> BatchResult:
+            # Stagger start times to keep the configured spacing between API calls
+            if delay_seconds > 0:
+                await asyncio.sleep((i - 1) * delay_seconds)
+
+            async with semaphore:
+                logger.info(f"Processing batch {i}/{len(batches)} with {len(batch_files)} files")
+                batch_result = await process_batch(batch_files)
 
-    def _process_cv_batch_with_retry(self, batch_files: List[Path]) -> CVBatchData:
-        """Process a CV batch with retry logic"""
-        last_exception = None
+            logger.info(
+                f"Batch {i} completed: {batch_result.successful_parses}/{batch_result.total_files} successful"
+            )
 
-        for attempt in range(settings.BATCH_RETRY_ATTEMPTS):
-            try:
-                if attempt > 0:
-                    logger.info(
-                        f"Retrying CV batch processing (attempt {attempt + 1}/{settings.BATCH_RETRY_ATTEMPTS})"
+            # Outside the semaphore, so saving overlaps with the next batch's LLM call
+            if on_batch_complete is not None:
+                try:
+                    await on_batch_complete(batch_result)
+                except Exception as e:
+                    logger.error(f"Post-processing of batch {i} failed: {e}")
+            return batch_result
+
+        tasks = [
+            asyncio.create_task(run(i, batch_files)) for i, batch_files in enumerate(batches, 1)
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Do not leave batches running if the consumer stops iterating early
+            for task in tasks:
+                task.cancel()
+
+    async def _process_batch_with_retry(
+        self, strategy: ParserStrategy[BatchResult], batch_files: List[Path]
+    ) -> BatchResult:
+        """Process a batch with retry logic"""
+        # Read and encode the files once; every attempt reuses the same payloads
+        files = await asyncio.to_thread(load_file_infos, batch_files)
+        batch_result = await self._parse_with_split(strategy, files)
+
+        # The encoded files are only needed for the requests; drop them from the results so
+        # they are not kept alive while the batch is saved, nor written into its summary
+        return batch_result.model_copy(
+            update={
+                "results": [
+                    result.model_copy(
+                        update={
+                            "file_info": result.file_info.model_copy(update={"base64_content": ""})
+                        }
                     )
-                    time.sleep(settings.BATCH_DELAY_SECONDS)
+                    for result in batch_result.results
+                ]
+            }
+        )
 
-                return self.cv_gemini_parser.parse_cv_batch(batch_files)
+    async def _parse_with_split(
+        self, strategy: ParserStrategy[BatchResult], files: List[Union[FileInfo, Path]]
+    ) -> BatchResult:
+        """Parse a batch and re-send the files the LLM left out in batches of half the size
 
-            except Exception as e:
-                last_exception = e
-                logger.error(f"CV batch processing attempt {attempt + 1} failed: {e}")
+        Files missing from a response usually mean the batch overflowed the model's context or
+        output budget, so the batch size is halved for just those files until they go alone.
+        Other failures (unreadable files, errors of the request itself) are not split.
+        """
+        batch_result = await self._parse_with_retry(strategy, files)
+
+        dropped = [
+            result.file_info
+            for result in batch_result.results
+            if result.error_message == NO_DATA_RETURNED
+        ]
+        if len(files) < 2 or not dropped:
+            return batch_result
 
-        logger.error(f"CV batch processing failed after {settings.BATCH_RETRY_ATTEMPTS} attempts")
-        return self.cv_gemini_parser._create_empty_cv_batch_result(
-            "failed_batch", len(batch_files), time.time(), str(last_exception)
+        smaller_size = len(files) // 2
+        logger.info(
+            f"Re-sending {len(dropped)} failed {strategy.label} files in batches of {smaller_size}"
         )
+        # One after another, so the split stays within this batch's concurrency slot
+        retried: List[BatchResult] = []
+        for start in range(0, len(dropped), smaller_size):
+            retried.append(
+                await self._parse_with_split(strategy, dropped[start : start + smaller_size])
+            )
 
-    def _process_job_batch_with_retry(self, batch_files: List[Path]) -> JobBatchData:
-        """Process a Job batch with retry logic"""
+        results = [
+            result for result in batch_result.results if result.error_message != NO_DATA_RETURNED
+        ]
+        results.extend(result for sub_batch in retried for result in sub_batch.results)
+        successful_parses = sum(1 for result in results if result.success)
+        return batch_result.model_copy(
+            update={
+                "results": results,
+                "successful_parses": successful_parses,
+                "failed_parses": batch_result.total_files - successful_parses,
+                "batch_processing_time_seconds": batch_result.batch_processing_time_seconds
+                + sum(sub_batch.batch_processing_time_seconds for sub_batch in retried),
+            }
+        )
+
+    async def _parse_with_retry(
+        self, strategy: ParserStrategy[BatchResult], files: List[Union[FileInfo, Path]]
+    ) -> BatchResult:
+        """Send one batch request, retrying failed attempts with backoff"""
         last_exception = None
+        retry_attempts = settings.BATCH_RETRY_ATTEMPTS
 
-        for attempt in range(settings.BATCH_RETRY_ATTEMPTS):
+        for attempt in range(retry_attempts):
             try:
                 if attempt > 0:
                     logger.info(
-                        f"Retrying Job batch processing (attempt {attempt + 1}/{settings.BATCH_RETRY_ATTEMPTS})"
+                        f"Retrying {strategy.label} batch processing (attempt {attempt + 1}/{retry_attempts})"
                     )
-                    time.sleep(settings.BATCH_DELAY_SECONDS)
+                    await asyncio.sleep(_retry_delay(attempt, last_exception))
 
-                return self.job_gemini_parser.parse_job_batch(batch_files)
+                return await strategy.parse_batch(files)
 
             except Exception as e:
                 last_exception = e
-                logger.error(f"Job batch processing attempt {attempt + 1} failed: {e}")
+                logger.error(
+                    f"{strategy.label} batch processing attempt {attempt + 1} failed: {e}"
+                )
 
-        logger.error(f"Job batch processing failed after {settings.BATCH_RETRY_ATTEMPTS} attempts")
-        return self.job_gemini_parser._create_empty_job_batch_result(
-            "failed_batch", len(batch_files), time.time(), str(last_exception)
-        )
+        logger.error(f"{strategy.label} batch processing failed after {retry_attempts} attempts")
+        return strategy.empty_result("failed_batch", len(files), time.time(), str(last_exception))
 
     def _create_empty_stats(
         self, session_id: str, start_time: float, file_type: str
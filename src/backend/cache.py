@@ -0,0 +1,54 @@
+"""
+In-process caching helpers for read-heavy API endpoints.
+"""
+
+from threading import Lock
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from src.backend.config import settings
+
+
+class TTLCache:
+    """Thread-safe in-memory cache whose entries expire after a fixed time-to-live"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Cache value under key, evicting the oldest entry when full"""
+        if self.ttl_seconds <= 0:
+            return
+
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global response cache for the list/detail endpoints
+response_cache = TTLCache(
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+)
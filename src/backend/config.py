@@ -1,6 +1,8 @@
 from datetime import datetime
+import os
 from pathlib import Path
-from typing import List
+import sys
+from typing import Dict, FrozenSet, List
 
 from loguru import logger
 from pydantic import BaseModel
@@ -16,10 +18,10 @@ class Settings(BaseModel):
     REPORTS_DIR: Path = PROJECT_ROOT / "reports"
     LOGS_DIR: Path = PROJECT_ROOT / "logs"
 
-    SUPPORTED_CV_FORMATS: List[str] = {
-        "images": [".png", ".jpg", ".jpeg"],
-        "documents": [".pdf", ".docx", ".doc"],
-        "all": [".png", ".jpg", ".jpeg", ".pdf", ".docx", ".doc"],
+    SUPPORTED_CV_FORMATS: Dict[str, FrozenSet[str]] = {
+        "images": frozenset({".png", ".jpg", ".jpeg"}),
+        "documents": frozenset({".pdf", ".docx", ".doc"}),
+        "all": frozenset({".png", ".jpg", ".jpeg", ".pdf", ".docx", ".doc"}),
     }
     CV_DIRECTORY: Path = RAW_DATA_DIR / "cvs"
     JOB_DESCRIPTIONS_DIR: Path = RAW_DATA_DIR / "Job Descriptions"
@@ -29,13 +31,23 @@ class Settings(BaseModel):
     BATCH_SIZE_JOB: int = 2
     MAX_FILE_SIZE_MB: int = 20
     BATCH_RETRY_ATTEMPTS: int = 3
+    # Retries wait uniform(0, min(MAX, BACKOFF * BASE ** attempt)) unless the API sends Retry-After
+    BATCH_RETRY_BACKOFF_SECONDS: float = 0.5
+    BATCH_RETRY_BACKOFF_BASE: float = 1.3
+    BATCH_RETRY_MAX_DELAY_SECONDS: float = 30.0
     BATCH_DELAY_SECONDS: float = 1.0
+    BATCH_MAX_CONCURRENCY: int = 4  # batches awaiting the LLM at the same time
 
     # Database configuration
     DATABASE_NAME: str = "perfect_candidate_pool.db"
     DATABASE_DIR: str = f"{DATA_DIR}/{DATABASE_NAME}"
     DATABASE_URL: str = f"sqlite:///{DATABASE_DIR}"
     DATABASE_TIMEOUT: int = 30
+    # Prepared statements kept per connection (sqlite3 defaults to 128)
+    DATABASE_CACHED_STATEMENTS: int = 256
+    # Page cache per connection in KiB, and how much of the file is memory-mapped in bytes
+    DATABASE_CACHE_SIZE_KB: int = 64 * 1024
+    DATABASE_MMAP_SIZE: int = 256 * 1024 * 1024
 
     # Logging configuration
     LOG_LEVEL: str = "INFO"
@@ -44,13 +56,42 @@ class Settings(BaseModel):
     # API settings (for future web interface)
     API_HOST: str = "localhost"
     API_PORT: int = 8000
+    API_WORKERS: int = os.cpu_count() or 1
+    API_THREAD_LIMIT: int = (os.cpu_count() or 1) * 4  # threads for blocking I/O per worker
+    # Cached responses are keyed on their table's write counter, so the TTL only bounds how
+    # long unused entries are kept; 0 disables the response cache
+    RESPONSE_CACHE_TTL_SECONDS: float = 60.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    # Origins allowed to call the API (Vite dev server); empty leaves CORS to the reverse proxy
+    CORS_ALLOW_ORIGINS: List[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
+
+    # Matching configuration
+    # Re-rank only the top (limit * factor) candidates by summary embedding; 0 scores everyone
+    MATCHING_SHORTLIST_FACTOR: int = 0
+    # Threads reserved for CPU-heavy scoring, kept apart from the default I/O thread pool
+    MATCHING_THREAD_LIMIT: int = os.cpu_count() or 1
+    MATCHING_CHUNK_SIZE: int = 100  # candidates scored per thread-pool task
+    # Cached job contexts are trusted this long before re-checking the job's updated_at
+    JOB_CONTEXT_TTL_SECONDS: float = 300.0
+    JOB_CONTEXT_CACHE_SIZE: int = 256
+    EMBEDDING_BATCH_SIZE: int = 100  # texts per embed_documents request to the provider
 
     # Gemini model settings
     GEMINI_MODEL: str = "gemini-2.5-flash"
     GEMINI_TEMPERATURE: float = 0.1
+    # Proactive per-minute quota for all Gemini calls of the process (0 disables a limit)
+    GEMINI_RPM: int = 10
+    GEMINI_TPM: int = 250_000
+    # Input tokens charged against GEMINI_TPM per file: Gemini bills a PDF page or an image
+    # at ~258 tokens, so this covers a few pages plus the file's share of the prompt
+    GEMINI_TOKENS_PER_FILE: int = 1_000
+    # Reuse earlier LLM extractions of files whose content has not changed
+    PARSE_CACHE_ENABLED: bool = True
 
     # saving cv or jd result
     SAVE_INTO_JSON: bool = False
+    # Also write one pretty-printed JSON file per parsed document next to the batch NDJSON
+    SAVE_PARSED_FILES_SEPARATELY: bool = False
     SAVE_INTO_DB: bool = True
 
 
@@ -67,10 +108,13 @@ log_filepath = settings.LOGS_DIR / log_filename
 logger.remove()
 
 # configure logger to log to console and file
+# enqueue hands messages to a background thread, so logging from the batch pipeline
+# does not wait on console I/O
 logger.add(
-    lambda msg: print(f"[LOG] {msg}", end=""),
-    format="{time:HH:mm:ss} | {level} | {message}",
+    sys.stderr,
+    format="[LOG] {time:HH:mm:ss} | {level} | {message}",
     level=settings.LOG_LEVEL,
+    enqueue=True,
 )
 logger.add(
     log_filepath,
@@ -79,4 +123,6 @@ logger.add(
     rotation="10 MB",
     retention="30 days",
     compression="zip",
+    # Writes, and the zip compression at rotation, happen on loguru's background thread
+    enqueue=True,
 )
@@ -2,19 +2,297 @@
 CRUD operations for candidate pool management system using sqlite3.
 """
 
+from functools import lru_cache
 import json
 import sqlite3
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Type
 
 from loguru import logger
+import orjson
+from pydantic import BaseModel, TypeAdapter
 
-from .database import db_manager
+from .database import SEARCH_COLUMNS, get_db_manager
 from .models import CVData, JobData
 
+# DML and the single-row lookups are kept in module constants so every call sends the
+# identical SQL text, which sqlite3 serves from the connection's prepared-statement cache
+# instead of re-parsing
+_INSERT_CANDIDATE_SQL = """
+    INSERT INTO candidates (
+        full_name, email, phone, address, linkedin, github, website,
+        summary, years_of_experience, current_position, current_company,
+        education, experience, skills, certifications, languages,
+        projects, awards, publications, source_file
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPDATE_CANDIDATE_SQL = """
+    UPDATE candidates SET
+        full_name = ?, email = ?, phone = ?, address = ?, linkedin = ?,
+        github = ?, website = ?, summary = ?, years_of_experience = ?,
+        current_position = ?, current_company = ?, education = ?,
+        experience = ?, skills = ?, certifications = ?, languages = ?,
+        projects = ?, awards = ?, publications = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+    RETURNING *
+"""
+
+_INSERT_JOB_SQL = """
+    INSERT INTO job_descriptions (
+        job_title, job_id, department, employment_type, work_arrangement,
+        location, job_summary, job_description, responsibilities, company_info,
+        required_skills, preferred_skills, education_requirements, experience_requirements,
+        certifications_required, certifications_preferred, languages_required,
+        min_years_experience, max_years_experience, seniority_level, salary_info,
+        application_deadline, application_process, contact_email, contact_person,
+        travel_requirements, security_clearance, visa_sponsorship, diversity_statement,
+        urgency_level, posted_date, last_updated, source_file
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPDATE_JOB_SQL = """
+    UPDATE job_descriptions SET
+        job_title = ?, job_id = ?, department = ?, employment_type = ?,
+        work_arrangement = ?, location = ?, job_summary = ?, job_description = ?,
+        responsibilities = ?, company_info = ?, required_skills = ?, preferred_skills = ?,
+        education_requirements = ?, experience_requirements = ?, certifications_required = ?,
+        certifications_preferred = ?, languages_required = ?, min_years_experience = ?,
+        max_years_experience = ?, seniority_level = ?, salary_info = ?,
+        application_deadline = ?, application_process = ?, contact_email = ?,
+        contact_person = ?, travel_requirements = ?, security_clearance = ?,
+        visa_sponsorship = ?, diversity_statement = ?, urgency_level = ?,
+        posted_date = ?, last_updated = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+    RETURNING *
+"""
+
+_SELECT_CANDIDATE_SQL = "SELECT * FROM candidates WHERE id = ?"
+_SELECT_JOB_SQL = "SELECT * FROM job_descriptions WHERE id = ?"
+_SELECT_JOB_BY_JOB_ID_SQL = "SELECT * FROM job_descriptions WHERE job_id = ?"
+
+_INSERT_MATCH_SQL = """
+    INSERT INTO candidate_job_matches (
+        candidate_id, job_id, overall_score, skills_score,
+        experience_score, education_score, match_details
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@lru_cache(maxsize=None)
+def _json_object_sql(
+    table: str, json_fields: Tuple[str, ...], columns: Optional[Tuple[str, ...]] = None
+) -> str:
+    """Build a json_object(...) expression over the given columns (default: all) of table
+
+    Columns holding JSON strings are embedded as JSON values (NULL if invalid),
+    mirroring what _row_to_dict does in Python.
+    """
+    if columns is None:
+        columns = [
+            row["name"]
+            for row in get_db_manager().execute_query(
+                f"PRAGMA table_info({table})", fetch_all=True
+            )
+        ]
+    pairs = []
+    for column in columns:
+        value = (
+            f"CASE WHEN json_valid({column}) THEN json({column}) END"
+            if column in json_fields
+            else column
+        )
+        pairs.append(f"'{column}', {value}")
+    return f"json_object({', '.join(pairs)})"
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def _json_column(value: Any) -> Optional[str]:
+    """JSON text stored in a TEXT column, None for empty values
+
+    Models and lists of models are serialized straight to JSON by pydantic's core
+    serializer, without building intermediate dicts; plain values go through orjson.
+    """
+    if not value:
+        return None
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    if isinstance(value, list) and isinstance(value[0], BaseModel):
+        return _list_adapter(type(value[0])).dump_json(value).decode()
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def _search_filter(table: str, search_term: str) -> Tuple[str, List[str]]:
+    """Build the WHERE fragment and params for a case-insensitive substring search
+
+    Uses the trigram FTS5 index of the table; terms shorter than a trigram (or
+    databases without FTS5) fall back to LIKE over the same columns.
+    """
+    if get_db_manager().fts_enabled and len(search_term) >= 3:
+        phrase = '"' + search_term.replace('"', '""') + '"'
+        return f" AND id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)", [phrase]
+
+    columns = SEARCH_COLUMNS[table]
+    like_clause = " OR ".join(f"{column} LIKE ?" for column in columns)
+    return f" AND ({like_clause})", [f"%{search_term}%"] * len(columns)
+
+
+def _row_to_dict(row: sqlite3.Row, json_fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Convert a SQLite row (or a dict of its columns) to a dictionary, parsing JSON fields"""
+    data = dict(row)
+    for field in json_fields:
+        value = data.get(field)
+        if value:
+            try:
+                data[field] = orjson.loads(value)
+            except orjson.JSONDecodeError:
+                data[field] = None
+    return data
+
+
+def _rows_to_dicts(rows: List[sqlite3.Row], json_fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Convert many rows like _row_to_dict, decoding each JSON column of the whole page with a
+    single orjson call over the values joined into one array"""
+    records = [dict(row) for row in rows]
+    for field in json_fields:
+        indexes = [i for i, record in enumerate(records) if record.get(field)]
+        if not indexes:
+            continue
+        try:
+            values = orjson.loads("[" + ",".join(records[i][field] for i in indexes) + "]")
+        except (orjson.JSONDecodeError, TypeError):
+            values = None
+        if values is None or len(values) != len(indexes):
+            # Some value is not a single valid document; decode one by one so only it is lost
+            for i in indexes:
+                records[i] = _row_to_dict(records[i], (field,))
+            continue
+        for i, value in zip(indexes, values):
+            records[i][field] = value
+    return records
+
+
+def _page_clause(skip: int, limit: int, after: Optional[Tuple[str, int]]) -> Tuple[str, List]:
+    """Build the ORDER BY/LIMIT fragment and params for a newest-first page
+
+    With `after`, the (created_at, id) of the last row of the previous page, the page is
+    found by seeking the created_at index instead of scanning and discarding `skip` rows.
+    """
+    if after is None:
+        return " ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?", [limit, skip]
+    return (
+        " AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+        [after[0], after[1], limit, skip],
+    )
+
 
 class CandidateService:
     """Service class for candidate CRUD operations"""
 
+    JSON_FIELDS = (
+        "education",
+        "experience",
+        "skills",
+        "certifications",
+        "languages",
+        "projects",
+        "awards",
+        "publications",
+    )
+
+    # Columns read by the similarity metrics
+    SIMILARITY_FIELDS = (
+        "id",
+        "full_name",
+        "summary",
+        "years_of_experience",
+        "education",
+        "experience",
+        "skills",
+        "certifications",
+        "languages",
+    )
+
+    # Columns returned by list views asking for a summary, none of them JSON
+    SUMMARY_FIELDS = (
+        "id",
+        "full_name",
+        "email",
+        "current_position",
+        "current_company",
+        "years_of_experience",
+        "created_at",
+    )
+
+    @staticmethod
+    def _candidate_params(cv_data: CVData, last_param: Any) -> tuple:
+        """Column values of a candidate row, JSON-encoded where needed, followed by
+        last_param (source_file for inserts, the candidate ID for updates)"""
+        return (
+            cv_data.full_name,
+            cv_data.email,
+            cv_data.phone,
+            cv_data.address,
+            cv_data.linkedin,
+            cv_data.github,
+            cv_data.website,
+            cv_data.summary,
+            cv_data.years_of_experience,
+            cv_data.current_position,
+            cv_data.current_company,
+            _json_column(cv_data.education),
+            _json_column(cv_data.experience),
+            _json_column(cv_data.skills),
+            _json_column(cv_data.certifications),
+            _json_column(cv_data.languages),
+            _json_column(cv_data.projects),
+            _json_column(cv_data.awards),
+            _json_column(cv_data.publications),
+            last_param,
+        )
+
+    @staticmethod
+    def create_candidates_bulk(
+        cv_data_list: List[CVData], source_files: Optional[List[Optional[str]]] = None
+    ) -> List[int]:
+        """
+        Create many candidates with one executemany in a single transaction
+
+        Args:
+            cv_data_list: CVData objects to insert
+            source_files: Path to the original CV file of each candidate (optional)
+
+        Returns:
+            IDs of the created candidates in input order, empty if the insert failed
+        """
+        if not cv_data_list:
+            return []
+        source_files = source_files or [None] * len(cv_data_list)
+
+        try:
+            row_count, last_id = get_db_manager().execute_many(
+                _INSERT_CANDIDATE_SQL,
+                (
+                    CandidateService._candidate_params(cv_data, source_file)
+                    for cv_data, source_file in zip(cv_data_list, source_files)
+                ),
+            )
+            # The write lock is held for the whole insert, so AUTOINCREMENT hands out
+            # consecutive IDs ending at the last inserted row
+            candidate_ids = list(range(last_id - row_count + 1, last_id + 1))
+            logger.info(f"Created {len(candidate_ids)} candidates")
+            return candidate_ids
+
+        except sqlite3.IntegrityError as e:
+            logger.error(f"Failed to create candidates - integrity error: {str(e)}")
+            return []
+        except Exception as e:
+            logger.error(f"Failed to create candidates: {str(e)}")
+            return []
+
     @staticmethod
     def create_candidate(
         cv_data: CVData, source_file: Optional[str] = None
@@ -30,67 +308,9 @@ class CandidateService:
             Created candidate dict or None if creation failed
         """
         try:
-            # Convert Pydantic models to JSON strings for storage
-            education_json = (
-                json.dumps([edu.dict() for edu in cv_data.education])
-                if cv_data.education
-                else None
-            )
-            experience_json = (
-                json.dumps([exp.dict() for exp in cv_data.experience])
-                if cv_data.experience
-                else None
-            )
-            skills_json = (
-                json.dumps([skill.dict() for skill in cv_data.skills]) if cv_data.skills else None
-            )
-            certifications_json = (
-                json.dumps([cert.dict() for cert in cv_data.certifications])
-                if cv_data.certifications
-                else None
-            )
-            languages_json = (
-                json.dumps([lang.dict() for lang in cv_data.languages])
-                if cv_data.languages
-                else None
-            )
-            projects_json = json.dumps(cv_data.projects) if cv_data.projects else None
-            awards_json = json.dumps(cv_data.awards) if cv_data.awards else None
-            publications_json = json.dumps(cv_data.publications) if cv_data.publications else None
-
-            query = """
-                INSERT INTO candidates (
-                    full_name, email, phone, address, linkedin, github, website,
-                    summary, years_of_experience, current_position, current_company,
-                    education, experience, skills, certifications, languages,
-                    projects, awards, publications, source_file
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-
-            params = (
-                cv_data.full_name,
-                cv_data.email,
-                cv_data.phone,
-                cv_data.address,
-                cv_data.linkedin,
-                cv_data.github,
-                cv_data.website,
-                cv_data.summary,
-                cv_data.years_of_experience,
-                cv_data.current_position,
-                cv_data.current_company,
-                education_json,
-                experience_json,
-                skills_json,
-                certifications_json,
-                languages_json,
-                projects_json,
-                awards_json,
-                publications_json,
-                source_file,
-            )
+            params = CandidateService._candidate_params(cv_data, source_file)
 
-            candidate_id = db_manager.execute_query(query, params)
+            candidate_id = get_db_manager().execute_query(_INSERT_CANDIDATE_SQL, params)
 
             if candidate_id:
                 logger.info(f"Created candidate: {cv_data.full_name} (ID: {candidate_id})")
@@ -108,21 +328,86 @@ class CandidateService:
     def get_candidate_by_id(candidate_id: int) -> Optional[Dict[str, Any]]:
         """Get candidate by ID"""
         try:
-            query = "SELECT * FROM candidates WHERE id = ?"
-            row = db_manager.execute_query(query, (candidate_id,), fetch_one=True)
+            row = get_db_manager().execute_query(
+                _SELECT_CANDIDATE_SQL, (candidate_id,), fetch_one=True
+            )
 
             if row:
-                return CandidateService._row_to_dict(row)
+                return _row_to_dict(row, CandidateService.JSON_FIELDS)
             return None
         except Exception as e:
             logger.error(f"Failed to get candidate {candidate_id}: {str(e)}")
             return None
 
+    @staticmethod
+    def get_candidate_ids(limit: int = 1000) -> List[int]:
+        """Get the IDs of the most recent candidates without loading their records"""
+        try:
+            query = "SELECT id FROM candidates ORDER BY created_at DESC, id DESC LIMIT ?"
+            rows = get_db_manager().execute_query(query, (limit,), fetch_all=True)
+            return [row["id"] for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to get candidate ids: {str(e)}")
+            return []
+
+    @staticmethod
+    def get_candidates_with_similarity_fields(
+        candidate_ids: List[int],
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Get the fields the similarity engine needs for many candidates in one query
+
+        Args:
+            candidate_ids: IDs of the candidates to load
+
+        Returns:
+            Candidate dictionaries keyed by ID, in the order of candidate_ids
+        """
+        if not candidate_ids:
+            return {}
+        try:
+            placeholders = ", ".join("?" * len(candidate_ids))
+            query = f"""
+                SELECT {", ".join(CandidateService.SIMILARITY_FIELDS)} FROM candidates
+                WHERE id IN ({placeholders})
+            """
+            rows = get_db_manager().execute_query(query, tuple(candidate_ids), fetch_all=True)
+            candidates = {
+                record["id"]: record
+                for record in _rows_to_dicts(rows, CandidateService.JSON_FIELDS)
+            }
+            return {
+                candidate_id: candidates[candidate_id]
+                for candidate_id in candidate_ids
+                if candidate_id in candidates
+            }
+        except Exception as e:
+            logger.error(f"Failed to get candidates for similarity: {str(e)}")
+            return {}
+
+    @staticmethod
+    def get_candidates_by_ids(candidate_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get full candidate records for the given IDs in a single query, keyed by ID"""
+        if not candidate_ids:
+            return {}
+        try:
+            placeholders = ", ".join("?" * len(candidate_ids))
+            query = f"SELECT * FROM candidates WHERE id IN ({placeholders})"
+            rows = get_db_manager().execute_query(query, tuple(candidate_ids), fetch_all=True)
+            return {
+                record["id"]: record
+                for record in _rows_to_dicts(rows, CandidateService.JSON_FIELDS)
+            }
+        except Exception as e:
+            logger.error(f"Failed to get candidates by ids: {str(e)}")
+            return {}
+
     @staticmethod
     def get_candidates(
         skip: int = 0,
         limit: int = 100,
         search_term: Optional[str] = None,
+        after: Optional[Tuple[str, int]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Get candidates with optional filtering and pagination
@@ -131,6 +416,7 @@ class CandidateService:
             skip: Number of records to skip
             limit: Maximum number of records to return
             search_term: Search in name, email, current position, or company
+            after: (created_at, id) of the last record of the previous page
 
         Returns:
             List of candidate dictionaries
@@ -140,88 +426,74 @@ class CandidateService:
             params = []
 
             if search_term:
-                query += " AND (full_name LIKE ? OR email LIKE ? OR current_position LIKE ? OR current_company LIKE ?)"
-                search_pattern = f"%{search_term}%"
-                params.extend([search_pattern, search_pattern, search_pattern, search_pattern])
+                search_clause, search_params = _search_filter("candidates", search_term)
+                query += search_clause
+                params.extend(search_params)
 
-            query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
-            params.extend([limit, skip])
+            page_clause, page_params = _page_clause(skip, limit, after)
+            query += page_clause
+            params.extend(page_params)
 
-            rows = db_manager.execute_query(query, tuple(params), fetch_all=True)
+            rows = get_db_manager().execute_query(query, tuple(params), fetch_all=True)
 
-            return [CandidateService._row_to_dict(row) for row in rows]
+            return _rows_to_dicts(rows, CandidateService.JSON_FIELDS)
         except Exception as e:
             logger.error(f"Failed to get candidates: {str(e)}")
             return []
 
     @staticmethod
-    def update_candidate(candidate_id: int, cv_data: CVData) -> Optional[Dict[str, Any]]:
-        """Update existing candidate"""
+    def get_candidates_json(
+        skip: int = 0,
+        limit: int = 100,
+        search_term: Optional[str] = None,
+        summary: bool = False,
+        after: Optional[Tuple[str, int]] = None,
+    ) -> List[str]:
+        """
+        Get candidates serialized to JSON by SQLite, one object string per row
+
+        Same filtering and ordering as get_candidates, without building Python dicts.
+        With summary, only SUMMARY_FIELDS are read, skipping the large JSON columns.
+        """
         try:
-            # Convert Pydantic models to JSON strings
-            education_json = (
-                json.dumps([edu.dict() for edu in cv_data.education])
-                if cv_data.education
-                else None
-            )
-            experience_json = (
-                json.dumps([exp.dict() for exp in cv_data.experience])
-                if cv_data.experience
-                else None
-            )
-            skills_json = (
-                json.dumps([skill.dict() for skill in cv_data.skills]) if cv_data.skills else None
-            )
-            certifications_json = (
-                json.dumps([cert.dict() for cert in cv_data.certifications])
-                if cv_data.certifications
-                else None
+            json_object = _json_object_sql(
+                "candidates",
+                CandidateService.JSON_FIELDS,
+                CandidateService.SUMMARY_FIELDS if summary else None,
             )
-            languages_json = (
-                json.dumps([lang.dict() for lang in cv_data.languages])
-                if cv_data.languages
-                else None
-            )
-            projects_json = json.dumps(cv_data.projects) if cv_data.projects else None
-            awards_json = json.dumps(cv_data.awards) if cv_data.awards else None
-            publications_json = json.dumps(cv_data.publications) if cv_data.publications else None
+            query = f"SELECT {json_object} FROM candidates WHERE 1=1"
+            params = []
 
-            query = """
-                UPDATE candidates SET
-                    full_name = ?, email = ?, phone = ?, address = ?, linkedin = ?,
-                    github = ?, website = ?, summary = ?, years_of_experience = ?,
-                    current_position = ?, current_company = ?, education = ?,
-                    experience = ?, skills = ?, certifications = ?, languages = ?,
-                    projects = ?, awards = ?, publications = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """
+            if search_term:
+                search_clause, search_params = _search_filter("candidates", search_term)
+                query += search_clause
+                params.extend(search_params)
 
-            params = (
-                cv_data.full_name,
-                cv_data.email,
-                cv_data.phone,
-                cv_data.address,
-                cv_data.linkedin,
-                cv_data.github,
-                cv_data.website,
-                cv_data.summary,
-                cv_data.years_of_experience,
-                cv_data.current_position,
-                cv_data.current_company,
-                education_json,
-                experience_json,
-                skills_json,
-                certifications_json,
-                languages_json,
-                projects_json,
-                awards_json,
-                publications_json,
-                candidate_id,
-            )
+            page_clause, page_params = _page_clause(skip, limit, after)
+            query += page_clause
+            params.extend(page_params)
+
+            rows = get_db_manager().execute_query(query, tuple(params), fetch_all=True)
+
+            return [row[0] for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to get candidates: {str(e)}")
+            return []
+
+    @staticmethod
+    def update_candidate(candidate_id: int, cv_data: CVData) -> Optional[Dict[str, Any]]:
+        """Update existing candidate"""
+        try:
+            params = CandidateService._candidate_params(cv_data, candidate_id)
+
+            # RETURNING * hands back the updated row, so no second SELECT is needed
+            row = get_db_manager().execute_returning(_UPDATE_CANDIDATE_SQL, params)
+            if row is None:
+                logger.warning(f"Candidate {candidate_id} not found for update")
+                return None
 
-            db_manager.execute_query(query, params)
             logger.info(f"Updated candidate ID: {candidate_id}")
-            return CandidateService.get_candidate(candidate_id)
+            return _row_to_dict(row, CandidateService.JSON_FIELDS)
 
         except Exception as e:
             logger.error(f"Failed to update candidate {candidate_id}: {str(e)}")
@@ -239,44 +511,202 @@ class CandidateService:
             True if successful, False otherwise
         """
         try:
-            query = "DELETE FROM candidates WHERE id = ?"
-            db_manager.execute_query(query, (candidate_id,))
+            # Match rows reference the candidate without ON DELETE CASCADE, so with foreign
+            # keys enforced they are removed first, in the same transaction
+            with get_db_manager().get_connection() as conn, conn:
+                conn.execute(
+                    "DELETE FROM candidate_job_matches WHERE candidate_id = ?", (candidate_id,)
+                )
+                conn.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,))
             logger.info(f"Permanently deleted candidate ID: {candidate_id}")
+            return True
 
         except Exception as e:
             logger.error(f"Failed to delete candidate {candidate_id}: {str(e)}")
             return False
 
     @staticmethod
-    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
-        """Convert SQLite row to dictionary with JSON parsing"""
-        data = dict(row)
-
-        # Parse JSON fields
-        json_fields = [
-            "education",
-            "experience",
-            "skills",
-            "certifications",
-            "languages",
-            "projects",
-            "awards",
-            "publications",
-        ]
+    def save_candidate_embedding(candidate_id: int, summary_embedding: bytes) -> bool:
+        """Store (or replace) the precomputed summary embedding of a candidate"""
+        try:
+            query = """
+                INSERT OR REPLACE INTO candidate_embeddings (candidate_id, summary_embedding)
+                VALUES (?, ?)
+            """
+            get_db_manager().execute_query(query, (candidate_id, summary_embedding))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save embedding for candidate {candidate_id}: {str(e)}")
+            return False
+
+    @staticmethod
+    def save_candidate_embeddings_bulk(embeddings: List[Tuple[int, bytes]]) -> int:
+        """Store (or replace) many (candidate ID, summary embedding) pairs in one transaction"""
+        if not embeddings:
+            return 0
+        try:
+            query = """
+                INSERT OR REPLACE INTO candidate_embeddings (candidate_id, summary_embedding)
+                VALUES (?, ?)
+            """
+            row_count, _ = get_db_manager().execute_many(query, embeddings)
+            return row_count
+        except Exception as e:
+            logger.error(f"Failed to save {len(embeddings)} candidate embeddings: {str(e)}")
+            return 0
+
+    @staticmethod
+    def get_candidate_embeddings(candidate_ids: List[int]) -> Dict[int, bytes]:
+        """Get precomputed summary embeddings keyed by candidate ID"""
+        if not candidate_ids:
+            return {}
+        try:
+            placeholders = ", ".join("?" * len(candidate_ids))
+            query = f"""
+                SELECT candidate_id, summary_embedding FROM candidate_embeddings
+                WHERE candidate_id IN ({placeholders}) AND summary_embedding IS NOT NULL
+            """
+            rows = get_db_manager().execute_query(query, tuple(candidate_ids), fetch_all=True)
+            return {row["candidate_id"]: row["summary_embedding"] for row in rows}
+        except Exception as e:
+            logger.error(f"Failed to get candidate embeddings: {str(e)}")
+            return {}
 
-        for field in json_fields:
-            if data.get(field):
-                try:
-                    data[field] = json.loads(data[field])
-                except json.JSONDecodeError:
-                    data[field] = None
+    @staticmethod
+    def get_all_candidate_embeddings() -> Dict[int, bytes]:
+        """Get every precomputed summary embedding keyed by candidate ID"""
+        try:
+            query = """
+                SELECT candidate_id, summary_embedding FROM candidate_embeddings
+                WHERE summary_embedding IS NOT NULL ORDER BY candidate_id
+            """
+            rows = get_db_manager().execute_query(query, fetch_all=True)
+            return {row["candidate_id"]: row["summary_embedding"] for row in rows}
+        except Exception as e:
+            logger.error(f"Failed to get candidate embeddings: {str(e)}")
+            return {}
 
-        return data
+    @staticmethod
+    def get_candidate_embeddings_version() -> Optional[int]:
+        """Get the write counter of the embeddings table, which changes on every write"""
+        try:
+            return get_db_manager().table_version("candidate_embeddings")
+        except Exception as e:
+            logger.error(f"Failed to get candidate embeddings version: {str(e)}")
+            return None
 
 
 class JobService:
     """Service class for job description CRUD operations"""
 
+    JSON_FIELDS = (
+        "responsibilities",
+        "company_info",
+        "required_skills",
+        "preferred_skills",
+        "education_requirements",
+        "experience_requirements",
+        "certifications_required",
+        "certifications_preferred",
+        "languages_required",
+        "salary_info",
+    )
+
+    # Columns returned by list views asking for a summary, none of them JSON
+    SUMMARY_FIELDS = (
+        "id",
+        "job_title",
+        "job_id",
+        "department",
+        "location",
+        "seniority_level",
+        "created_at",
+    )
+
+    @staticmethod
+    def _job_params(job_data: JobData, last_param: Any) -> tuple:
+        """Column values of a job row, JSON-encoded where needed, followed by
+        last_param (source_file for inserts, the job ID for updates)"""
+        return (
+            job_data.job_title,
+            job_data.job_id,
+            job_data.department,
+            job_data.employment_type,
+            job_data.work_arrangement,
+            job_data.location,
+            job_data.job_summary,
+            job_data.job_description,
+            _json_column(job_data.responsibilities),
+            _json_column(job_data.company),
+            _json_column(job_data.required_skills),
+            _json_column(job_data.preferred_skills),
+            _json_column(job_data.education_requirements),
+            _json_column(job_data.experience_requirements),
+            _json_column(job_data.certifications_required),
+            _json_column(job_data.certifications_preferred),
+            _json_column(job_data.languages_required),
+            job_data.min_years_experience,
+            job_data.max_years_experience,
+            job_data.seniority_level,
+            _json_column(job_data.salary_info),
+            job_data.application_deadline,
+            job_data.application_process,
+            job_data.contact_email,
+            job_data.contact_person,
+            job_data.travel_requirements,
+            job_data.security_clearance,
+            job_data.visa_sponsorship,
+            job_data.diversity_statement,
+            job_data.urgency_level,
+            job_data.posted_date,
+            job_data.last_updated,
+            last_param,
+        )
+
+    @staticmethod
+    def create_jobs_bulk(
+        job_data_list: List[JobData], source_files: Optional[List[Optional[str]]] = None
+    ) -> List[int]:
+        """
+        Create many job descriptions with one executemany in a single transaction
+
+        Args:
+            job_data_list: JobData objects to insert
+            source_files: Path to the original file of each job description (optional)
+
+        Returns:
+            IDs of the created jobs in input order, skipping jobs that failed to insert
+        """
+        if not job_data_list:
+            return []
+        source_files = source_files or [None] * len(job_data_list)
+
+        try:
+            row_count, last_id = get_db_manager().execute_many(
+                _INSERT_JOB_SQL,
+                (
+                    JobService._job_params(job_data, source_file)
+                    for job_data, source_file in zip(job_data_list, source_files)
+                ),
+            )
+            # Consecutive while the write lock is held, as in create_candidates_bulk
+            job_ids = list(range(last_id - row_count + 1, last_id + 1))
+            logger.info(f"Created {len(job_ids)} jobs")
+            return job_ids
+
+        except sqlite3.IntegrityError as e:
+            # A duplicate job_id rolls back the whole batch; insert one by one so only the
+            # conflicting jobs are lost
+            logger.warning(f"Bulk job insert failed ({str(e)}), inserting jobs one by one")
+            created = (
+                JobService.create_job(job_data, source_file)
+                for job_data, source_file in zip(job_data_list, source_files)
+            )
+            return [job["id"] for job in created if job]
+        except Exception as e:
+            logger.error(f"Failed to create jobs: {str(e)}")
+            return []
+
     @staticmethod
     def create_job(
         job_data: JobData, source_file: Optional[str] = None
@@ -292,100 +722,9 @@ class JobService:
             Created job dict or None if creation failed
         """
         try:
-            # Convert complex objects to JSON strings
-            responsibilities_json = (
-                json.dumps(job_data.responsibilities) if job_data.responsibilities else None
-            )
-            company_info_json = json.dumps(job_data.company.dict()) if job_data.company else None
-            required_skills_json = (
-                json.dumps([skill.dict() for skill in job_data.required_skills])
-                if job_data.required_skills
-                else None
-            )
-            preferred_skills_json = (
-                json.dumps([skill.dict() for skill in job_data.preferred_skills])
-                if job_data.preferred_skills
-                else None
-            )
-            education_requirements_json = (
-                json.dumps(job_data.education_requirements)
-                if job_data.education_requirements
-                else None
-            )
-            experience_requirements_json = (
-                json.dumps(job_data.experience_requirements)
-                if job_data.experience_requirements
-                else None
-            )
-            certifications_required_json = (
-                json.dumps(job_data.certifications_required)
-                if job_data.certifications_required
-                else None
-            )
-            certifications_preferred_json = (
-                json.dumps(job_data.certifications_preferred)
-                if job_data.certifications_preferred
-                else None
-            )
-            languages_required_json = (
-                json.dumps([lang.dict() for lang in job_data.languages_required])
-                if job_data.languages_required
-                else None
-            )
-            salary_info_json = (
-                json.dumps(job_data.salary_info.dict()) if job_data.salary_info else None
-            )
-
-            query = """
-                INSERT INTO job_descriptions (
-                    job_title, job_id, department, employment_type, work_arrangement,
-                    location, job_summary, job_description, responsibilities, company_info,
-                    required_skills, preferred_skills, education_requirements, experience_requirements,
-                    certifications_required, certifications_preferred, languages_required,
-                    min_years_experience, max_years_experience, seniority_level, salary_info,
-                    application_deadline, application_process, contact_email, contact_person,
-                    travel_requirements, security_clearance, visa_sponsorship, diversity_statement,
-                    urgency_level, posted_date, last_updated, source_file
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-
-            params = (
-                job_data.job_title,
-                job_data.job_id,
-                job_data.department,
-                job_data.employment_type,
-                job_data.work_arrangement,
-                job_data.location,
-                job_data.job_summary,
-                job_data.job_description,
-                responsibilities_json,
-                company_info_json,
-                required_skills_json,
-                preferred_skills_json,
-                education_requirements_json,
-                experience_requirements_json,
-                certifications_required_json,
-                certifications_preferred_json,
-                languages_required_json,
-                job_data.min_years_experience,
-                job_data.max_years_experience,
-                job_data.seniority_level,
-                salary_info_json,
-                job_data.application_deadline,
-                job_data.application_process,
-                job_data.contact_email,
-                job_data.contact_person,
-                job_data.travel_requirements,
-                job_data.security_clearance,
-                job_data.visa_sponsorship,
-                job_data.diversity_statement,
-                job_data.urgency_level,
-                job_data.posted_date,
-                job_data.last_updated,
-                source_file,
-            )
+            params = JobService._job_params(job_data, source_file)
 
-            job_id = db_manager.execute_query(query, params)
+            job_id = get_db_manager().execute_query(_INSERT_JOB_SQL, params)
 
             if job_id:
                 logger.info(f"Created job: {job_data.job_title} (ID: {job_id})")
@@ -403,11 +742,10 @@ class JobService:
     def get_job(job_id: int) -> Optional[Dict[str, Any]]:
         """Get job description by ID"""
         try:
-            query = "SELECT * FROM job_descriptions WHERE id = ?"
-            row = db_manager.execute_query(query, (job_id,), fetch_one=True)
+            row = get_db_manager().execute_query(_SELECT_JOB_SQL, (job_id,), fetch_one=True)
 
             if row:
-                return JobService._row_to_dict(row)
+                return _row_to_dict(row, JobService.JSON_FIELDS)
             return None
         except Exception as e:
             logger.error(f"Failed to get job {job_id}: {str(e)}")
@@ -417,11 +755,12 @@ class JobService:
     def get_job_by_job_id(job_id: str) -> Optional[Dict[str, Any]]:
         """Get job description by external job ID"""
         try:
-            query = "SELECT * FROM job_descriptions WHERE job_id = ?"
-            row = db_manager.execute_query(query, (job_id,), fetch_one=True)
+            row = get_db_manager().execute_query(
+                _SELECT_JOB_BY_JOB_ID_SQL, (job_id,), fetch_one=True
+            )
 
             if row:
-                return JobService._row_to_dict(row)
+                return _row_to_dict(row, JobService.JSON_FIELDS)
             return None
         except Exception as e:
             logger.error(f"Failed to get job by job_id {job_id}: {str(e)}")
@@ -432,6 +771,7 @@ class JobService:
         skip: int = 0,
         limit: int = 100,
         search_term: Optional[str] = None,
+        after: Optional[Tuple[str, int]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Get job descriptions with optional filtering and pagination
@@ -440,6 +780,7 @@ class JobService:
             skip: Number of records to skip
             limit: Maximum number of records to return
             search_term: Search in title, department, location, or summary
+            after: (created_at, id) of the last record of the previous page
 
         Returns:
             List of job description dictionaries
@@ -449,122 +790,73 @@ class JobService:
             params = []
 
             if search_term:
-                query += " AND (job_title LIKE ? OR department LIKE ? OR location LIKE ? OR job_summary LIKE ?)"
-                search_pattern = f"%{search_term}%"
-                params.extend([search_pattern, search_pattern, search_pattern, search_pattern])
+                search_clause, search_params = _search_filter("job_descriptions", search_term)
+                query += search_clause
+                params.extend(search_params)
 
-            query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
-            params.extend([limit, skip])
+            page_clause, page_params = _page_clause(skip, limit, after)
+            query += page_clause
+            params.extend(page_params)
 
-            rows = db_manager.execute_query(query, tuple(params), fetch_all=True)
+            rows = get_db_manager().execute_query(query, tuple(params), fetch_all=True)
 
-            return [JobService._row_to_dict(row) for row in rows]
+            return _rows_to_dicts(rows, JobService.JSON_FIELDS)
         except Exception as e:
             logger.error(f"Failed to get jobs: {str(e)}")
             return []
 
     @staticmethod
-    def update_job(job_id: int, job_data: JobData) -> Optional[Dict[str, Any]]:
-        """Update existing job description"""
+    def get_jobs_json(
+        skip: int = 0,
+        limit: int = 100,
+        search_term: Optional[str] = None,
+        summary: bool = False,
+        after: Optional[Tuple[str, int]] = None,
+    ) -> List[str]:
+        """
+        Get job descriptions serialized to JSON by SQLite, one object string per row
+
+        Same filtering and ordering as get_jobs, without building Python dicts.
+        With summary, only SUMMARY_FIELDS are read, skipping the large JSON columns.
+        """
         try:
-            # Convert complex objects to JSON strings
-            responsibilities_json = (
-                json.dumps(job_data.responsibilities) if job_data.responsibilities else None
-            )
-            company_info_json = json.dumps(job_data.company.dict()) if job_data.company else None
-            required_skills_json = (
-                json.dumps([skill.dict() for skill in job_data.required_skills])
-                if job_data.required_skills
-                else None
-            )
-            preferred_skills_json = (
-                json.dumps([skill.dict() for skill in job_data.preferred_skills])
-                if job_data.preferred_skills
-                else None
-            )
-            education_requirements_json = (
-                json.dumps(job_data.education_requirements)
-                if job_data.education_requirements
-                else None
-            )
-            experience_requirements_json = (
-                json.dumps(job_data.experience_requirements)
-                if job_data.experience_requirements
-                else None
-            )
-            certifications_required_json = (
-                json.dumps(job_data.certifications_required)
-                if job_data.certifications_required
-                else None
-            )
-            certifications_preferred_json = (
-                json.dumps(job_data.certifications_preferred)
-                if job_data.certifications_preferred
-                else None
-            )
-            languages_required_json = (
-                json.dumps([lang.dict() for lang in job_data.languages_required])
-                if job_data.languages_required
-                else None
-            )
-            salary_info_json = (
-                json.dumps(job_data.salary_info.dict()) if job_data.salary_info else None
+            json_object = _json_object_sql(
+                "job_descriptions",
+                JobService.JSON_FIELDS,
+                JobService.SUMMARY_FIELDS if summary else None,
             )
+            query = f"SELECT {json_object} FROM job_descriptions WHERE 1=1"
+            params = []
 
-            query = """
-                UPDATE job_descriptions SET
-                    job_title = ?, job_id = ?, department = ?, employment_type = ?,
-                    work_arrangement = ?, location = ?, job_summary = ?, job_description = ?,
-                    responsibilities = ?, company_info = ?, required_skills = ?, preferred_skills = ?,
-                    education_requirements = ?, experience_requirements = ?, certifications_required = ?,
-                    certifications_preferred = ?, languages_required = ?, min_years_experience = ?,
-                    max_years_experience = ?, seniority_level = ?, salary_info = ?,
-                    application_deadline = ?, application_process = ?, contact_email = ?,
-                    contact_person = ?, travel_requirements = ?, security_clearance = ?,
-                    visa_sponsorship = ?, diversity_statement = ?, urgency_level = ?,
-                    posted_date = ?, last_updated = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """
+            if search_term:
+                search_clause, search_params = _search_filter("job_descriptions", search_term)
+                query += search_clause
+                params.extend(search_params)
 
-            params = (
-                job_data.job_title,
-                job_data.job_id,
-                job_data.department,
-                job_data.employment_type,
-                job_data.work_arrangement,
-                job_data.location,
-                job_data.job_summary,
-                job_data.job_description,
-                responsibilities_json,
-                company_info_json,
-                required_skills_json,
-                preferred_skills_json,
-                education_requirements_json,
-                experience_requirements_json,
-                certifications_required_json,
-                certifications_preferred_json,
-                languages_required_json,
-                job_data.min_years_experience,
-                job_data.max_years_experience,
-                job_data.seniority_level,
-                salary_info_json,
-                job_data.application_deadline,
-                job_data.application_process,
-                job_data.contact_email,
-                job_data.contact_person,
-                job_data.travel_requirements,
-                job_data.security_clearance,
-                job_data.visa_sponsorship,
-                job_data.diversity_statement,
-                job_data.urgency_level,
-                job_data.posted_date,
-                job_data.last_updated,
-                job_id,
-            )
+            page_clause, page_params = _page_clause(skip, limit, after)
+            query += page_clause
+            params.extend(page_params)
+
+            rows = get_db_manager().execute_query(query, tuple(params), fetch_all=True)
+
+            return [row[0] for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to get jobs: {str(e)}")
+            return []
+
+    @staticmethod
+    def update_job(job_id: int, job_data: JobData) -> Optional[Dict[str, Any]]:
+        """Update existing job description"""
+        try:
+            params = JobService._job_params(job_data, job_id)
+
+            row = get_db_manager().execute_returning(_UPDATE_JOB_SQL, params)
+            if row is None:
+                logger.warning(f"Job {job_id} not found for update")
+                return None
 
-            db_manager.execute_query(query, params)
             logger.info(f"Updated job ID: {job_id}")
-            return JobService.get_job(job_id)
+            return _row_to_dict(row, JobService.JSON_FIELDS)
 
         except Exception as e:
             logger.error(f"Failed to update job {job_id}: {str(e)}")
@@ -582,42 +874,18 @@ class JobService:
             True if successful, False otherwise
         """
         try:
-            query = "DELETE FROM job_descriptions WHERE id = ?"
-            db_manager.execute_query(query, (job_id,))
+            # Match rows reference the job without ON DELETE CASCADE, so with foreign
+            # keys enforced they are removed first, in the same transaction
+            with get_db_manager().get_connection() as conn, conn:
+                conn.execute("DELETE FROM candidate_job_matches WHERE job_id = ?", (job_id,))
+                conn.execute("DELETE FROM job_descriptions WHERE id = ?", (job_id,))
             logger.info(f"Permanently deleted job ID: {job_id}")
+            return True
 
         except Exception as e:
             logger.error(f"Failed to delete job {job_id}: {str(e)}")
             return False
 
-    @staticmethod
-    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
-        """Convert SQLite row to dictionary with JSON parsing"""
-        data = dict(row)
-
-        # Parse JSON fields
-        json_fields = [
-            "responsibilities",
-            "company_info",
-            "required_skills",
-            "preferred_skills",
-            "education_requirements",
-            "experience_requirements",
-            "certifications_required",
-            "certifications_preferred",
-            "languages_required",
-            "salary_info",
-        ]
-
-        for field in json_fields:
-            if data.get(field):
-                try:
-                    data[field] = json.loads(data[field])
-                except json.JSONDecodeError:
-                    data[field] = None
-
-        return data
-
 
 class MatchService:
     """Service class for candidate-job matching operations"""
@@ -634,14 +902,7 @@ class MatchService:
     ) -> Optional[int]:
         """Create a new candidate-job match record"""
         try:
-            match_details_json = json.dumps(match_details) if match_details else None
-
-            query = """
-                INSERT INTO candidate_job_matches (
-                    candidate_id, job_id, overall_score, skills_score,
-                    experience_score, education_score, match_details
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
+            match_details_json = _json_column(match_details)
 
             params = (
                 candidate_id,
@@ -653,7 +914,7 @@ class MatchService:
                 match_details_json,
             )
 
-            match_id = db_manager.execute_query(query, params)
+            match_id = get_db_manager().execute_query(_INSERT_MATCH_SQL, params)
             logger.info(
                 f"Created match: Candidate {candidate_id} - Job {job_id} (Score: {overall_score})"
             )
@@ -663,6 +924,42 @@ class MatchService:
             logger.error(f"Failed to create match: {str(e)}")
             return None
 
+    @staticmethod
+    def create_matches_bulk(matches: List[Dict[str, Any]]) -> int:
+        """
+        Create many candidate-job match records with one executemany in a single transaction
+
+        Args:
+            matches: Dicts with the keyword arguments of create_match
+
+        Returns:
+            Number of matches created, 0 if the insert failed
+        """
+        if not matches:
+            return 0
+        try:
+            row_count, _ = get_db_manager().execute_many(
+                _INSERT_MATCH_SQL,
+                (
+                    (
+                        match["candidate_id"],
+                        match["job_id"],
+                        match["overall_score"],
+                        match.get("skills_score"),
+                        match.get("experience_score"),
+                        match.get("education_score"),
+                        _json_column(match.get("match_details")),
+                    )
+                    for match in matches
+                ),
+            )
+            logger.info(f"Created {row_count} matches")
+            return row_count
+
+        except Exception as e:
+            logger.error(f"Failed to create matches: {str(e)}")
+            return 0
+
     @staticmethod
     def get_matches_for_candidate(
         candidate_id: int, min_score: Optional[float] = None
@@ -678,7 +975,7 @@ class MatchService:
 
             query += " ORDER BY overall_score DESC"
 
-            rows = db_manager.execute_query(query, tuple(params), fetch_all=True)
+            rows = get_db_manager().execute_query(query, tuple(params), fetch_all=True)
             return [dict(row) for row in rows]
         except Exception as e:
             logger.error(f"Failed to get matches for candidate {candidate_id}: {str(e)}")
@@ -699,8 +996,42 @@ class MatchService:
 
             query += " ORDER BY overall_score DESC"
 
-            rows = db_manager.execute_query(query, tuple(params), fetch_all=True)
+            rows = get_db_manager().execute_query(query, tuple(params), fetch_all=True)
             return [dict(row) for row in rows]
         except Exception as e:
             logger.error(f"Failed to get matches for job {job_id}: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+
+    @staticmethod
+    def get_job_and_candidate_ids(
+        job_id: int, candidate_limit: int = 1000
+    ) -> Tuple[Optional[Dict[str, Any]], List[int]]:
+        """
+        Load a job and the IDs of the most recent candidates in a single statement
+
+        Args:
+            job_id: ID of the job description to match against
+            candidate_limit: Maximum number of candidate IDs to return
+
+        Returns:
+            The job dictionary (None if it does not exist) and the candidate IDs
+        """
+        try:
+            query = """
+                SELECT job_descriptions.*, (
+                    SELECT json_group_array(id) FROM (
+                        SELECT id FROM candidates ORDER BY created_at DESC LIMIT ?
+                    )
+                ) AS matching_candidate_ids
+                FROM job_descriptions WHERE id = ?
+            """
+            row = get_db_manager().execute_query(query, (candidate_limit, job_id), fetch_one=True)
+            if not row:
+                return None, []
+
+            data = dict(row)
+            candidate_ids = json.loads(data.pop("matching_candidate_ids"))
+            return _row_to_dict(data, JobService.JSON_FIELDS), candidate_ids
+        except Exception as e:
+            logger.error(f"Failed to get job {job_id} with candidate ids: {str(e)}")
+            return None, []
@@ -3,14 +3,174 @@ Database models and schema for candidate pool management system using sqlite3.
 """
 
 from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 import sqlite3
-from typing import Optional
+import threading
+from typing import Iterable, Optional, Tuple
 
 from loguru import logger
 
 from src.backend.config import settings
 
+# Columns covered by the free-text `search` of the list endpoints, indexed in `<table>_fts`
+SEARCH_COLUMNS = {
+    "candidates": ("full_name", "email", "current_position", "current_company"),
+    "job_descriptions": ("job_title", "department", "location", "job_summary"),
+}
+
+
+# Tables and indexes, run as one script by init_database
+_SCHEMA_SQL = """
+BEGIN;
+
+-- Candidates and jobs keep AUTOINCREMENT so a deleted ID is never handed out again: API
+-- responses, embeddings and job contexts are cached by these IDs. Match rows are only
+-- looked up by candidate and job, so they key on the plain rowid
+-- Create candidates table
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name TEXT NOT NULL,
+    email TEXT,
+    phone TEXT,
+    address TEXT,
+    linkedin TEXT,
+    github TEXT,
+    website TEXT,
+    summary TEXT,
+    years_of_experience INTEGER,
+    current_position TEXT,
+    current_company TEXT,
+    education TEXT,  -- JSON string
+    experience TEXT,  -- JSON string
+    skills TEXT,  -- JSON string
+    certifications TEXT,  -- JSON string
+    languages TEXT,  -- JSON string
+    projects TEXT,  -- JSON string
+    awards TEXT,  -- JSON string
+    publications TEXT,  -- JSON string
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    source_file TEXT
+);
+
+-- Create job_descriptions table
+CREATE TABLE IF NOT EXISTS job_descriptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_title TEXT NOT NULL,
+    job_id TEXT UNIQUE,
+    department TEXT,
+    employment_type TEXT,
+    work_arrangement TEXT,
+    location TEXT,
+    job_summary TEXT,
+    job_description TEXT,
+    responsibilities TEXT,  -- JSON string
+    company_info TEXT,  -- JSON string
+    required_skills TEXT,  -- JSON string
+    preferred_skills TEXT,  -- JSON string
+    education_requirements TEXT,  -- JSON string
+    experience_requirements TEXT,  -- JSON string
+    certifications_required TEXT,  -- JSON string
+    certifications_preferred TEXT,  -- JSON string
+    languages_required TEXT,  -- JSON string
+    min_years_experience INTEGER,
+    max_years_experience INTEGER,
+    seniority_level TEXT,
+    salary_info TEXT,  -- JSON string
+    application_deadline TEXT,
+    application_process TEXT,
+    contact_email TEXT,
+    contact_person TEXT,
+    travel_requirements TEXT,
+    security_clearance TEXT,
+    visa_sponsorship BOOLEAN,
+    diversity_statement TEXT,
+    urgency_level TEXT,
+    posted_date TEXT,
+    last_updated TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    source_file TEXT
+);
+
+-- Create candidate_job_matches table
+CREATE TABLE IF NOT EXISTS candidate_job_matches (
+    id INTEGER PRIMARY KEY,
+    candidate_id INTEGER NOT NULL,
+    job_id INTEGER NOT NULL,
+    overall_score REAL,
+    skills_score REAL,
+    experience_score REAL,
+    education_score REAL,
+    match_details TEXT,  -- JSON string
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (candidate_id) REFERENCES candidates (id),
+    FOREIGN KEY (job_id) REFERENCES job_descriptions (id)
+);
+
+-- Create candidate_embeddings table (precomputed at ingest, int8 + float32 scale)
+CREATE TABLE IF NOT EXISTS candidate_embeddings (
+    candidate_id INTEGER PRIMARY KEY,
+    summary_embedding BLOB,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (candidate_id) REFERENCES candidates (id) ON DELETE CASCADE
+);
+
+-- Create embedding_cache table (sha256 of model + text -> float32 vector)
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    hash BLOB PRIMARY KEY,
+    dim INTEGER NOT NULL,
+    vec BLOB NOT NULL
+);
+
+-- Create parse_cache table (sha256 of document type + model + file -> JSON)
+CREATE TABLE IF NOT EXISTS parse_cache (
+    hash BLOB PRIMARY KEY,
+    data BLOB NOT NULL
+);
+
+-- Indexes behind the newest-first listings and the best-match-first lookups.
+-- The created_at-only indexes are replaced by ones that also order ties by id,
+-- so keyset pages can seek on the (created_at, id) pair
+DROP INDEX IF EXISTS idx_candidates_created;
+DROP INDEX IF EXISTS idx_jobs_created;
+CREATE INDEX IF NOT EXISTS idx_candidates_created_id ON candidates (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_id ON job_descriptions (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_candidate_score
+ON candidate_job_matches (candidate_id, overall_score DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_job_score
+ON candidate_job_matches (job_id, overall_score DESC);
+
+-- One write counter per versioned table, bumped by the triggers below
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+COMMIT;
+"""
+
+# Tables whose every insert, update and delete bumps their row in table_versions, so
+# caches in any process can tell that the table changed since they were filled
+VERSIONED_TABLES = ("candidates", "job_descriptions", "candidate_embeddings")
+
+_VERSION_TRIGGERS_SQL = (
+    "BEGIN;\n"
+    + "".join(
+        f"""
+INSERT OR IGNORE INTO table_versions (name) VALUES ('{table}');
+CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix} AFTER {event} ON {table} BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+END;
+"""
+        for table in VERSIONED_TABLES
+        for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+    )
+    + "COMMIT;\n"
+)
+
 
 class DatabaseManager:
     """Database manager for SQLite operations"""
@@ -20,6 +180,10 @@ class DatabaseManager:
             self.db_path = settings.DATABASE_DIR
         else:
             self.db_path = db_path
+        self.fts_enabled = False
+        # One connection per worker thread, reused across queries (sqlite3 connections
+        # must not be shared between threads)
+        self._local = threading.local()
 
         logger.info(f"Using database at: {self.db_path}")
 
@@ -32,161 +196,189 @@ class DatabaseManager:
     def init_database(self):
         """Initialize database tables"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            # WAL lets readers run alongside a writer; the mode is stored in the database file
+            conn.execute("PRAGMA journal_mode=WAL")
 
-            # Create candidates table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS candidates (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    full_name TEXT NOT NULL,
-                    email TEXT,
-                    phone TEXT,
-                    address TEXT,
-                    linkedin TEXT,
-                    github TEXT,
-                    website TEXT,
-                    summary TEXT,
-                    years_of_experience INTEGER,
-                    current_position TEXT,
-                    current_company TEXT,
-                    education TEXT,  -- JSON string
-                    experience TEXT,  -- JSON string
-                    skills TEXT,  -- JSON string
-                    certifications TEXT,  -- JSON string
-                    languages TEXT,  -- JSON string
-                    projects TEXT,  -- JSON string
-                    awards TEXT,  -- JSON string
-                    publications TEXT,  -- JSON string
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    source_file TEXT
-                )
-            """)
-
-            # Create job_descriptions table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS job_descriptions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    job_title TEXT NOT NULL,
-                    job_id TEXT UNIQUE,
-                    department TEXT,
-                    employment_type TEXT,
-                    work_arrangement TEXT,
-                    location TEXT,
-                    job_summary TEXT,
-                    job_description TEXT,
-                    responsibilities TEXT,  -- JSON string
-                    company_info TEXT,  -- JSON string
-                    required_skills TEXT,  -- JSON string
-                    preferred_skills TEXT,  -- JSON string
-                    education_requirements TEXT,  -- JSON string
-                    experience_requirements TEXT,  -- JSON string
-                    certifications_required TEXT,  -- JSON string
-                    certifications_preferred TEXT,  -- JSON string
-                    languages_required TEXT,  -- JSON string
-                    min_years_experience INTEGER,
-                    max_years_experience INTEGER,
-                    seniority_level TEXT,
-                    salary_info TEXT,  -- JSON string
-                    application_deadline TEXT,
-                    application_process TEXT,
-                    contact_email TEXT,
-                    contact_person TEXT,
-                    travel_requirements TEXT,
-                    security_clearance TEXT,
-                    visa_sponsorship BOOLEAN,
-                    diversity_statement TEXT,
-                    urgency_level TEXT,
-                    posted_date TEXT,
-                    last_updated TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    source_file TEXT
-                )
-            """)
-
-            # Create candidate_job_matches table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS candidate_job_matches (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    candidate_id INTEGER NOT NULL,
-                    job_id INTEGER NOT NULL,
-                    overall_score REAL,
-                    skills_score REAL,
-                    experience_score REAL,
-                    education_score REAL,
-                    match_details TEXT,  -- JSON string
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (candidate_id) REFERENCES candidates (id),
-                    FOREIGN KEY (job_id) REFERENCES job_descriptions (id)
-                )
-            """)
+            # Each script is compiled and run in one call, inside a single transaction
+            conn.executescript(_SCHEMA_SQL)
+            conn.executescript(_VERSION_TRIGGERS_SQL)
 
-            conn.commit()
+            cursor = conn.cursor()
+            self.fts_enabled = self._create_search_indexes(cursor)
 
-            self._reset_autoincrement_sequences(conn.cursor())
+            conn.commit()
 
             logger.info("Database tables created successfully")
 
-    def _reset_autoincrement_sequences(self, cursor):
-        """Reset auto-increment sequences to start from the last existing ID in each table"""
-        tables = ["candidates", "job_descriptions", "candidate_job_matches"]
-
-        for table in tables:
-            try:
-                # Get the maximum ID from the table
-                cursor.execute(f"SELECT MAX(id) FROM {table}")
-                max_id = cursor.fetchone()[0]
-
-                if max_id is not None:
-                    # Update the sqlite_sequence table to set the next auto-increment value
-                    cursor.execute(
-                        "INSERT OR REPLACE INTO sqlite_sequence (name, seq) VALUES (?, ?)",
-                        (table, max_id),
+    def _create_search_indexes(self, cursor) -> bool:
+        """Create trigram FTS5 indexes for substring search, kept in sync by triggers"""
+        try:
+            for table, columns in SEARCH_COLUMNS.items():
+                fts_table = f"{table}_fts"
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (fts_table,))
+                is_new = cursor.fetchone() is None
+
+                column_list = ", ".join(columns)
+                new_values = ", ".join(f"new.{column}" for column in columns)
+                old_values = ", ".join(f"old.{column}" for column in columns)
+
+                cursor.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                        {column_list}, content='{table}', content_rowid='id', tokenize='trigram'
                     )
-                    logger.info(f"Reset auto-increment for {table} to start from {max_id + 1}")
-                else:
-                    logger.info(f"No existing data in {table}, auto-increment will start from 1")
-            except sqlite3.Error as e:
-                logger.warning(f"Could not reset auto-increment for {table}: {e}")
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN
+                        INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN
+                        INSERT INTO {fts_table} ({fts_table}, rowid, {column_list})
+                        VALUES ('delete', old.id, {old_values});
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {table} BEGIN
+                        INSERT INTO {fts_table} ({fts_table}, rowid, {column_list})
+                        VALUES ('delete', old.id, {old_values});
+                        INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+                    END
+                """)
+
+                # Index rows that existed before the search index was introduced
+                if is_new:
+                    cursor.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Full-text search unavailable, falling back to LIKE scans: {e}")
+            return False
+
+    def _open_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        if read_only:
+            conn = sqlite3.connect(
+                f"{Path(self.db_path).resolve().as_uri()}?mode=ro",
+                uri=True,
+                timeout=settings.DATABASE_TIMEOUT,
+                cached_statements=settings.DATABASE_CACHED_STATEMENTS,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=settings.DATABASE_TIMEOUT,
+                cached_statements=settings.DATABASE_CACHED_STATEMENTS,
+            )
+            # Under WAL (set once in init_database, it persists in the file) NORMAL sync only
+            # fsyncs at checkpoints instead of on every commit
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Enforce the schema's foreign keys, so deleting a candidate cascades to its
+            # stored embedding
+            conn.execute("PRAGMA foreign_keys=ON")
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # A negative cache_size is a size in KiB rather than a page count
+        conn.execute(f"PRAGMA cache_size=-{int(settings.DATABASE_CACHE_SIZE_KB)}")
+        conn.execute(f"PRAGMA mmap_size={int(settings.DATABASE_MMAP_SIZE)}")
+        return conn
 
     @contextmanager
     def get_connection(self):
-        """Get database connection with context manager"""
-        conn = sqlite3.connect(self.db_path, timeout=settings.DATABASE_TIMEOUT)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
+        """Get this thread's database connection with context manager
+
+        The connection is opened on first use and then kept, so repeated queries skip the
+        connect cost and reuse sqlite3's prepared-statement cache. Leaving the outermost
+        block rolls back anything not committed, as closing the connection used to.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+            self._local.depth = 0
+
+        self._local.depth += 1
         try:
             yield conn
         finally:
-            conn.close()
+            self._local.depth -= 1
+            if self._local.depth == 0 and conn.in_transaction:
+                conn.rollback()
+
+    @contextmanager
+    def get_read_connection(self):
+        """Get this thread's read-only connection with context manager
+
+        Under WAL, reads on this connection never wait on a writer. While this thread has
+        an open write transaction its own connection is returned instead, so the reads
+        see the uncommitted changes.
+        """
+        write_conn = getattr(self._local, "conn", None)
+        if write_conn is not None and write_conn.in_transaction:
+            with self.get_connection() as conn:
+                yield conn
+            return
+
+        conn = getattr(self._local, "read_conn", None)
+        if conn is None:
+            conn = self._open_connection(read_only=True)
+            self._local.read_conn = conn
+        yield conn
+
+    def table_version(self, table: str) -> int:
+        """Write counter of a table in VERSIONED_TABLES; it changes with every committed write"""
+        with self.get_read_connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM table_versions WHERE name = ?", (table,)
+            ).fetchone()
+            return row[0] if row else 0
+
+    def execute_many(self, query: str, seq_of_params: Iterable[tuple]) -> Tuple[int, int]:
+        """Execute a statement for every parameter tuple in one transaction with one commit
+
+        Returns the number of affected rows and the rowid of the last inserted row.
+        """
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.executemany(query, seq_of_params)
+            last_row_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.commit()
+            return cursor.rowcount, last_row_id
+
+    def execute_returning(self, query: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+        """Execute a write with a RETURNING clause, commit, and return the first row"""
+        with self.get_connection() as conn:
+            # All rows are fetched first: the statement must finish before the commit
+            rows = conn.execute(query, params).fetchall()
+            conn.commit()
+            return rows[0] if rows else None
 
     def execute_query(
         self, query: str, params: tuple = (), fetch_one: bool = False, fetch_all: bool = False
     ):
-        """Execute a query and return results"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
+        """Execute a query and return results
+
+        Fetching queries run on the read-only connection, everything else on the writer.
+        """
+        if fetch_one or fetch_all:
+            with self.get_read_connection() as conn:
+                cursor = conn.execute(query, params)
+                return cursor.fetchone() if fetch_one else cursor.fetchall()
 
-            if fetch_one:
-                return cursor.fetchone()
-            elif fetch_all:
-                return cursor.fetchall()
-            else:
-                conn.commit()
-                return cursor.lastrowid
+        # The connection's own context manager commits on success and rolls back on error
+        with self.get_connection() as conn, conn:
+            return conn.execute(query, params).lastrowid
 
 
-# Global database manager instance
-db_manager = DatabaseManager()
+@lru_cache(maxsize=None)
+def get_db_manager() -> DatabaseManager:
+    """Process-wide database manager, created (and its schema initialized) on first use"""
+    return DatabaseManager()
 
 
 def create_tables():
     """Create all database tables"""
-    db_manager.init_database()
+    get_db_manager().init_database()
 
 
 def get_db_connection():
     """Get database connection"""
-    return db_manager.get_connection()
+    return get_db_manager().get_connection()
@@ -1,18 +1,22 @@
-import json
+import asyncio
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from loguru import logger
+from pydantic import BaseModel
 
+from src.backend.config import settings
 from src.backend.crud import CandidateService, JobService
-from src.backend.database import db_manager
+from src.backend.database import get_db_manager
 from src.backend.models import CVBatchData, CVData, JobBatchData, JobData
+from src.backend.similarity_engine.embedding_cache import get_cached_embedding_model
+from src.backend.utils import serialize_embedding
 
 
 def initialize_database():
     """Initialize database tables"""
     try:
-        db_manager.init_database()
+        get_db_manager().init_database()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {str(e)}")
@@ -40,6 +44,7 @@ def save_candidate_to_database(
             logger.info(
                 f"Successfully saved candidate {cv_data.full_name} with ID: {result.get('id')}"
             )
+            save_candidate_embedding(result["id"], cv_data.summary)
             return result
         else:
             logger.error(f"Failed to save candidate {cv_data.full_name}")
@@ -50,6 +55,93 @@ def save_candidate_to_database(
         return None
 
 
+def save_candidates_to_database(
+    cv_data_list: List[CVData], source_files: Optional[List[Optional[str]]] = None
+) -> List[int]:
+    """
+    Save many candidates to the database in a single transaction
+
+    Args:
+        cv_data_list: CVData objects containing candidate information
+        source_files: Path to the original CV file of each candidate
+
+    Returns:
+        IDs of the created candidates, empty if the insert failed
+    """
+    if not cv_data_list:
+        return []
+
+    candidate_ids = CandidateService.create_candidates_bulk(cv_data_list, source_files)
+    if not candidate_ids:
+        logger.error(f"Failed to save {len(cv_data_list)} candidates")
+        return []
+
+    logger.info(f"Successfully saved {len(candidate_ids)} candidates")
+    save_candidate_embeddings(candidate_ids, [cv_data.summary for cv_data in cv_data_list])
+    return candidate_ids
+
+
+def save_candidate_embeddings(candidate_ids: List[int], summaries: List[Optional[str]]) -> int:
+    """
+    Embed the summaries of many candidates at ingest and store them in one transaction
+
+    Args:
+        candidate_ids: IDs of the stored candidates
+        summaries: Professional summary text of each candidate
+
+    Returns:
+        Number of embeddings stored
+    """
+    pending = [
+        (candidate_id, summary)
+        for candidate_id, summary in zip(candidate_ids, summaries)
+        if summary
+    ]
+    if not pending:
+        return 0
+
+    try:
+        embeddings = get_cached_embedding_model().embed_queries(
+            [summary for _, summary in pending]
+        )
+    except Exception as e:
+        # Matching falls back to embedding the summaries on the fly
+        logger.warning(f"Could not embed summaries of {len(pending)} candidates: {str(e)}")
+        return 0
+
+    return CandidateService.save_candidate_embeddings_bulk(
+        [
+            (candidate_id, serialize_embedding(embedding))
+            for (candidate_id, _), embedding in zip(pending, embeddings)
+        ]
+    )
+
+
+def save_candidate_embedding(candidate_id: int, summary: Optional[str]) -> bool:
+    """
+    Embed a candidate summary once at ingest so matching only needs a dot product
+
+    Args:
+        candidate_id: ID of the stored candidate
+        summary: Professional summary text to embed
+
+    Returns:
+        True if the embedding was stored, False otherwise
+    """
+    if not summary:
+        return False
+
+    try:
+        embedding = get_cached_embedding_model().embed_query(summary)
+        return CandidateService.save_candidate_embedding(
+            candidate_id, serialize_embedding(embedding)
+        )
+    except Exception as e:
+        # Matching falls back to embedding the summary on the fly
+        logger.warning(f"Could not embed summary for candidate {candidate_id}: {str(e)}")
+        return False
+
+
 def save_job_description_to_database(
     job_data: JobData, source_file: Optional[str] = None
 ) -> Optional[dict]:
@@ -79,35 +171,86 @@ def save_job_description_to_database(
         return None
 
 
-def save_cv_batch_results_to_json(batch_result: CVBatchData, output_dir: str):
-    """Save CV batch results to files"""
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+def save_job_descriptions_to_database(
+    job_data_list: List[JobData], source_files: Optional[List[Optional[str]]] = None
+) -> List[int]:
+    """
+    Save many job descriptions to the database in a single transaction
 
-    batch_summary_file = output_path / f"cv_batch_{batch_result.batch_id}_summary.json"
-    with open(batch_summary_file, "w", encoding="utf-8") as f:
-        json.dump(batch_result.dict(), f, indent=2, ensure_ascii=False)
+    Args:
+        job_data_list: JobData objects containing job information
+        source_files: Path to the original file of each job description
 
-    for result in batch_result.results:
-        if result.success and result.cv_data:
-            cv_filename = Path(result.file_info.file_name).stem
-            cv_output_file = output_path / f"parsed_{cv_filename}.json"
-            with open(cv_output_file, "w", encoding="utf-8") as f:
-                json.dump(result.cv_data.dict(), f, indent=2, ensure_ascii=False)
+    Returns:
+        IDs of the created jobs
+    """
+    if not job_data_list:
+        return []
 
+    job_ids = JobService.create_jobs_bulk(job_data_list, source_files)
+    if not job_ids:
+        logger.error(f"Failed to save {len(job_data_list)} job descriptions")
+        return []
 
-def save_job_batch_results_to_json(batch_result: JobBatchData, output_dir: str):
-    """Save Job batch results to files"""
+    logger.info(f"Successfully saved {len(job_ids)} job descriptions")
+    return job_ids
+
+
+def _write_json_file(path: Path, data: BaseModel):
+    """Serialize a model straight to JSON and write it (runs in a worker thread)"""
+    path.write_text(data.model_dump_json(indent=2), encoding="utf-8")
+
+
+def _append_ndjson_file(path: Path, records: List[BaseModel]):
+    """Append models as NDJSON lines in a single write (runs in a worker thread)"""
+    with path.open("ab") as f:
+        f.write("".join(record.model_dump_json() + "\n" for record in records).encode("utf-8"))
+
+
+async def _save_batch_results(
+    output_dir: str,
+    prefix: str,
+    batch_id: str,
+    batch_result: BaseModel,
+    parsed: List[Tuple[str, BaseModel]],
+):
+    """Write the batch summary plus every parsed document as one NDJSON file per batch"""
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    batch_summary_file = output_path / f"job_batch_{batch_result.batch_id}_summary.json"
-    with open(batch_summary_file, "w", encoding="utf-8") as f:
-        json.dump(batch_result.dict(), f, indent=2, ensure_ascii=False)
+    files = [(output_path / f"{prefix}_batch_{batch_id}_summary.json", batch_result)]
+    if settings.SAVE_PARSED_FILES_SEPARATELY:
+        files.extend(
+            (output_path / f"parsed_{Path(file_name).stem}.json", data)
+            for file_name, data in parsed
+        )
 
-    for result in batch_result.results:
-        if result.success and result.job_data:
-            job_filename = Path(result.file_info.file_name).stem
-            job_output_file = output_path / f"parsed_{job_filename}.json"
-            with open(job_output_file, "w", encoding="utf-8") as f:
-                json.dump(result.job_data.dict(), f, indent=2, ensure_ascii=False)
+    writes = [asyncio.to_thread(_write_json_file, path, data) for path, data in files]
+    if parsed:
+        records = [data for _, data in parsed]
+        writes.append(
+            asyncio.to_thread(
+                _append_ndjson_file, output_path / f"{prefix}_batch_{batch_id}.ndjson", records
+            )
+        )
+    await asyncio.gather(*writes)
+
+
+async def save_cv_batch_results_to_json(batch_result: CVBatchData, output_dir: str):
+    """Save CV batch results to files"""
+    parsed = [
+        (result.file_info.file_name, result.cv_data)
+        for result in batch_result.results
+        if result.success and result.cv_data
+    ]
+    await _save_batch_results(output_dir, "cv", batch_result.batch_id, batch_result, parsed)
+
+
+async def save_job_batch_results_to_json(batch_result: JobBatchData, output_dir: str):
+    """Save Job batch results to files"""
+    parsed = [
+        (result.file_info.file_name, result.job_data)
+        for result in batch_result.results
+        if result.success and result.job_data
+    ]
+    await _save_batch_results(output_dir, "job", batch_result.batch_id, batch_result, parsed)
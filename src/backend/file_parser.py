@@ -1,9 +1,12 @@
+import asyncio
+from dataclasses import dataclass
 from pathlib import Path
 import time
-from typing import List
+from typing import List, Optional, Type, Union
 
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.prompts import SystemMessagePromptTemplate
+from langchain_core.runnables import Runnable
 from loguru import logger
 
 from src.backend.config import settings
@@ -11,316 +14,302 @@ from src.backend.models import (
     CVBatchData,
     CVBatchResponse,
     CVBatchResult,
+    CVData,
     FileInfo,
     JobBatchData,
     JobBatchResponse,
     JobBatchResult,
+    JobData,
 )
+from src.backend.parse_cache import ParseCache
 from src.backend.prompts import CV_PARSING_SYSTEM_PROMPT, JOB_DESCRIPTION_PARSING_SYSTEM_PROMPT
+from src.backend.rate_limiter import gemini_rate_limiter
 from src.backend.utils import (
     create_file_info,
     generate_batch_id,
     get_llm,
 )
 
+# Error of a file the LLM left out of its response, usually because the batch overflowed
+# the model's output budget
+NO_DATA_RETURNED = "No data returned from LLM for this file"
+
+
+class LLMRequestError(Exception):
+    """The batch request to the LLM failed; raised so the caller can retry the batch
+
+    The error raised by the client (429, quota, network) is kept as __cause__.
+    """
+
+
+@dataclass(frozen=True)
+class _BatchKind:
+    """Everything that differs between a CV batch and a job description batch"""
+
+    # Name in log messages, and the document type named in the prompt
+    label: str
+    document: str
+    # Field of the structured LLM response holding the parsed files
+    response_key: str
+    # Field of the per-file result holding the parsed data
+    data_field: str
+    result_type: Type[Union[CVBatchResult, JobBatchResult]]
+    batch_type: Type[Union[CVBatchData, JobBatchData]]
+
+    def result(
+        self,
+        file_info: FileInfo,
+        data: Optional[Union[CVData, JobData]],
+        error_message: Optional[str] = None,
+        processing_time: float = 0.0,
+    ) -> Union[CVBatchResult, JobBatchResult]:
+        """Per-file result; it counts as a success when there is parsed data"""
+        return self.result_type(
+            file_info=file_info,
+            success=data is not None,
+            error_message=error_message,
+            processing_time_seconds=processing_time,
+            **{self.data_field: data},
+        )
+
+
+_CV_BATCH = _BatchKind("CV", "CV", "cvs", "cv_data", CVBatchResult, CVBatchData)
+_JOB_BATCH = _BatchKind("Job", "job description", "jobs", "job_data", JobBatchResult, JobBatchData)
+
 
 class GeminiParser:
     """CV and Job Description Parser using Google Gemini model with batch processing support"""
 
     def __init__(
         self,
-        parser: PydanticOutputParser,
         model: str = settings.GEMINI_MODEL,
         temperature: float = settings.GEMINI_TEMPERATURE,
     ) -> None:
         self.llm = get_llm(model=model, temperature=temperature)
-        self.parser: PydanticOutputParser = parser
 
-    def parse_cv_batch(self, cv_paths: List[Path]) -> CVBatchData:
+        # Compose the prompt -> LLM -> structured output runnables once and reuse them for
+        # every batch instead of rebuilding the tool schema per request. The schema travels
+        # as a function declaration, so the prompts carry no format instructions
+        self.cv_chain = self.llm.with_structured_output(CVBatchResponse)
+        self.job_chain = self.llm.with_structured_output(JobBatchResponse)
+
+        # Render the system prompts once: every request then starts with the same bytes, which
+        # is what Gemini's implicit prefix caching keys on
+        self.cv_system_message = SystemMessagePromptTemplate.from_template(
+            CV_PARSING_SYSTEM_PROMPT
+        ).format()
+        self.job_system_message = SystemMessagePromptTemplate.from_template(
+            JOB_DESCRIPTION_PARSING_SYSTEM_PROMPT
+        ).format()
+
+        self.cv_cache = ParseCache(CVData, model)
+        self.job_cache = ParseCache(JobData, model)
+
+    def parse_cv_batch(self, cv_paths: List[Union[Path, FileInfo]]) -> CVBatchData:
         """Parse multiple CV files in a single batch request"""
+        return asyncio.run(self.parse_cv_batch_async(cv_paths))
+
+    async def parse_cv_batch_async(self, cv_paths: List[Union[Path, FileInfo]]) -> CVBatchData:
+        """Parse multiple CV files in a single batch request without blocking the event loop
+
+        Files may be given as paths or as FileInfo objects that were already read and encoded.
+        Raises LLMRequestError when the request to the LLM itself fails.
+        """
+        return await self._parse_batch(
+            _CV_BATCH, self.cv_chain, self.cv_system_message, self.cv_cache, cv_paths
+        )
+
+    def parse_job_batch(self, jd_paths: List[Union[Path, FileInfo]]) -> JobBatchData:
+        """Parse multiple job description files in a single batch request"""
+        return asyncio.run(self.parse_job_batch_async(jd_paths))
+
+    async def parse_job_batch_async(self, jd_paths: List[Union[Path, FileInfo]]) -> JobBatchData:
+        """Parse multiple job description files in a single batch request without blocking
+
+        Files may be given as paths or as FileInfo objects that were already read and encoded.
+        Raises LLMRequestError when the request to the LLM itself fails.
+        """
+        return await self._parse_batch(
+            _JOB_BATCH, self.job_chain, self.job_system_message, self.job_cache, jd_paths
+        )
+
+    async def _parse_batch(
+        self,
+        kind: _BatchKind,
+        chain: Runnable,
+        system_message: BaseMessage,
+        cache: ParseCache,
+        paths: List[Union[Path, FileInfo]],
+    ) -> Union[CVBatchData, JobBatchData]:
+        """Parse one batch of either kind: answer what the parse cache can, send the rest
+        to the LLM in a single request and cache what comes back
+        """
         batch_start_time = time.time()
         batch_id = generate_batch_id()
-        results: List[CVBatchResult] = []
+        results: List[Union[CVBatchResult, JobBatchResult]] = []
 
-        logger.info(f"Starting CV batch processing: {batch_id} with {len(cv_paths)} files")
+        logger.info(f"Starting {kind.label} batch processing: {batch_id} with {len(paths)} files")
 
         try:
             file_infos: List[FileInfo] = []
-            for cv_path in cv_paths:
-                try:
-                    file_info = create_file_info(cv_path)
-                    file_infos.append(file_info)
-                except Exception as e:
-                    logger.error(f"Error preparing file {cv_path}: {e}")
+            for path, prepared in zip(paths, await self._prepare_files(paths)):
+                if isinstance(prepared, Exception):
+                    logger.error(f"Error preparing file {path}: {prepared}")
                     results.append(
-                        CVBatchResult(
-                            file_info=FileInfo(
-                                file_path=cv_path,
-                                file_name=cv_path.split("/")[-1],
-                                file_type="unknown",
-                                mime_type="unknown",
-                                file_size_bytes=0,
-                                base64_content="",
-                            ),
-                            cv_data=None,
-                            success=False,
-                            error_message=str(e),
-                            processing_time_seconds=0.0,
-                        )
+                        kind.result(self._fallback_file_info(path), None, str(prepared))
                     )
                     continue
+                file_infos.append(prepared)
 
             if not file_infos:
                 logger.error("No valid files to process in batch")
-                return self._create_empty_cv_batch_result(
-                    batch_id, len(cv_paths), batch_start_time
-                )
+                return self._empty_batch_data(kind, batch_id, len(paths), batch_start_time)
 
-            media_contents = []
-            file_descriptions = []
-
-            for i, file_info in enumerate(file_infos):
-                media_contents.append(
-                    {"type": "text", "text": f"\n--- FILE {i + 1}: {file_info.file_name} ---"}
-                )
-                media_contents.append(
-                    {
-                        "type": "media",
-                        "source_type": "base64",
-                        "data": file_info.base64_content,
-                        "mime_type": file_info.mime_type,
-                    }
-                )
-                file_descriptions.append(f"File {i + 1}: {file_info.file_name}")
-
-            instruction_text = (
-                f"Please analyze these {len(file_infos)} CV files and extract all information "
-                f"according to the structured format provided in the system message. "
-                f"Process each CV independently and return structured data for all files in the 'cvs' array.\n\n"
-                f"Files to process:\n" + "\n".join(file_descriptions)
-            )
-
-            media_contents.insert(0, {"type": "text", "text": instruction_text})
-
-            prompt_template = ChatPromptTemplate(
-                [("system", CV_PARSING_SYSTEM_PROMPT), ("human", media_contents)]
-            )
+            cached = await asyncio.to_thread(cache.lookup, file_infos)
+            for file_info, data in zip(file_infos, cached):
+                if data is not None:
+                    results.append(kind.result(file_info, data))
+            file_infos = [fi for fi, data in zip(file_infos, cached) if data is None]
+            if not file_infos:
+                return self._batch_data(kind, batch_id, len(paths), batch_start_time, results)
 
-            prompt_messages = prompt_template.invoke(
-                {
-                    "format_instructions": PydanticOutputParser(
-                        pydantic_object=CVBatchResponse
-                    ).get_format_instructions()
-                }
-            )
+            prompt_messages = [
+                system_message,
+                self._batch_message(file_infos, kind.document, kind.response_key),
+            ]
 
+            await gemini_rate_limiter.acquire(self._estimate_tokens(file_infos))
             llm_start_time = time.time()
             try:
-                batch_response: CVBatchResponse = self.llm.with_structured_output(
-                    CVBatchResponse
-                ).invoke(prompt_messages)
-                llm_processing_time = time.time() - llm_start_time
-
-                for i, file_info in enumerate(file_infos):
-                    if i < len(batch_response.cvs) and batch_response.cvs[i] is not None:
-                        results.append(
-                            CVBatchResult(
-                                file_info=file_info,
-                                cv_data=batch_response.cvs[i],
-                                success=True,
-                                error_message=None,
-                                processing_time_seconds=llm_processing_time / len(file_infos),
-                            )
-                        )
-                    else:
-                        results.append(
-                            CVBatchResult(
-                                file_info=file_info,
-                                cv_data=None,
-                                success=False,
-                                error_message="No data returned from LLM for this file",
-                                processing_time_seconds=0.0,
-                            )
-                        )
-
+                batch_response = await chain.ainvoke(prompt_messages)
             except Exception as e:
                 logger.error(f"Error during LLM processing for batch {batch_id}: {e}")
-                for file_info in file_infos:
+                raise LLMRequestError(f"LLM processing error: {str(e)}") from e
+            llm_processing_time = time.time() - llm_start_time
+
+            parsed = getattr(batch_response, kind.response_key)
+            for i, file_info in enumerate(file_infos):
+                if i < len(parsed) and parsed[i] is not None:
                     results.append(
-                        CVBatchResult(
-                            file_info=file_info,
-                            cv_data=None,
-                            success=False,
-                            error_message=f"LLM processing error: {str(e)}",
-                            processing_time_seconds=0.0,
+                        kind.result(
+                            file_info,
+                            parsed[i],
+                            processing_time=llm_processing_time / len(file_infos),
                         )
                     )
+                else:
+                    results.append(kind.result(file_info, None, NO_DATA_RETURNED))
+
+            successes = [r for r in results[-len(file_infos) :] if r.success]
+            await asyncio.to_thread(
+                cache.store,
+                [r.file_info for r in successes],
+                [getattr(r, kind.data_field) for r in successes],
+            )
+
+        except LLMRequestError:
+            # Left to the caller, which retries the batch with backoff (or Retry-After)
+            raise
 
         except Exception as e:
-            logger.error(f"Critical error in CV batch processing {batch_id}: {e}")
-            return self._create_empty_cv_batch_result(
-                batch_id, len(cv_paths), batch_start_time, str(e)
-            )
+            logger.error(f"Critical error in {kind.label} batch processing {batch_id}: {e}")
+            return self._empty_batch_data(kind, batch_id, len(paths), batch_start_time, str(e))
+
+        return self._batch_data(kind, batch_id, len(paths), batch_start_time, results)
 
+    @staticmethod
+    def _batch_data(
+        kind: _BatchKind,
+        batch_id: str,
+        total_files: int,
+        batch_start_time: float,
+        results: List[Union[CVBatchResult, JobBatchResult]],
+    ) -> Union[CVBatchData, JobBatchData]:
+        """Summarize the per-file results of a finished batch"""
         batch_processing_time = time.time() - batch_start_time
         successful_parses = sum(1 for result in results if result.success)
         failed_parses = len(results) - successful_parses
 
         logger.info(
-            f"Completed CV batch {batch_id}: {successful_parses}/{len(results)} successful"
+            f"Completed {kind.label} batch {batch_id}: {successful_parses}/{len(results)} successful"
         )
 
-        return CVBatchData(
+        return kind.batch_type(
             batch_id=batch_id,
-            total_files=len(cv_paths),
+            total_files=total_files,
             successful_parses=successful_parses,
             failed_parses=failed_parses,
             batch_processing_time_seconds=batch_processing_time,
             results=results,
         )
 
-    def parse_job_batch(self, jd_paths: List[Path]) -> JobBatchData:
-        """Parse multiple job description files in a single batch request"""
-        batch_start_time = time.time()
-        batch_id = generate_batch_id()
-        results: List[JobBatchResult] = []
-
-        logger.info(f"Starting Job batch processing: {batch_id} with {len(jd_paths)} files")
-
-        try:
-            file_infos: List[FileInfo] = []
-            for jd_path in jd_paths:
-                try:
-                    file_info = create_file_info(jd_path)
-                    file_infos.append(file_info)
-                except Exception as e:
-                    logger.error(f"Error preparing file {jd_path}: {e}")
-                    results.append(
-                        JobBatchResult(
-                            file_info=FileInfo(
-                                file_path=jd_path,
-                                file_name=jd_path.split("/")[-1],
-                                file_type="unknown",
-                                mime_type="unknown",
-                                file_size_bytes=0,
-                                base64_content="",
-                            ),
-                            job_data=None,
-                            success=False,
-                            error_message=str(e),
-                            processing_time_seconds=0.0,
-                        )
-                    )
-                    continue
-
-            if not file_infos:
-                logger.error("No valid files to process in batch")
-                return self._create_empty_job_batch_result(
-                    batch_id, len(jd_paths), batch_start_time
-                )
-
-            media_contents = []
-            file_descriptions = []
-
-            for i, file_info in enumerate(file_infos):
-                media_contents.append(
-                    {"type": "text", "text": f"\n--- FILE {i + 1}: {file_info.file_name} ---"}
-                )
-                media_contents.append(
-                    {
-                        "type": "media",
-                        "source_type": "base64",
-                        "data": file_info.base64_content,
-                        "mime_type": file_info.mime_type,
-                    }
-                )
-                file_descriptions.append(f"File {i + 1}: {file_info.file_name}")
-
-            instruction_text = (
-                f"Please analyze these {len(file_infos)} job description files and extract all information "
-                f"according to the structured format provided in the system message. "
-                f"Process each job description independently and return structured data for all files in the 'jobs' array.\n\n"
-                f"Files to process:\n" + "\n".join(file_descriptions)
-            )
+    @staticmethod
+    async def _prepare_files(
+        paths: List[Union[Path, FileInfo]],
+    ) -> List[Union[FileInfo, Exception]]:
+        """Read and encode all files concurrently on worker threads, in input order
+
+        FileInfo inputs are passed through; a file that cannot be read yields its exception.
+        """
+
+        async def prepare(path: Union[Path, FileInfo]) -> FileInfo:
+            if isinstance(path, FileInfo):
+                return path
+            return await asyncio.to_thread(create_file_info, path)
+
+        return await asyncio.gather(*(prepare(path) for path in paths), return_exceptions=True)
+
+    @staticmethod
+    def _fallback_file_info(path: Union[Path, str]) -> FileInfo:
+        """FileInfo for a file that could not be read, so it can still be reported"""
+        path = Path(path)
+        return FileInfo(
+            file_path=str(path),
+            file_name=path.name,
+            file_type="unknown",
+            mime_type="unknown",
+            file_size_bytes=0,
+            base64_content="",
+        )
 
-            media_contents.insert(0, {"type": "text", "text": instruction_text})
+    @staticmethod
+    def _batch_message(file_infos: List[FileInfo], label: str, response_key: str) -> HumanMessage:
+        """The user turn of a batch request: the instructions, then each file behind a header"""
+        media_contents = []
+        file_descriptions = []
 
-            prompt_template = ChatPromptTemplate(
-                [("system", JOB_DESCRIPTION_PARSING_SYSTEM_PROMPT), ("human", media_contents)]
+        for i, file_info in enumerate(file_infos):
+            media_contents.append(
+                {"type": "text", "text": f"\n--- FILE {i + 1}: {file_info.file_name} ---"}
             )
-
-            prompt_messages = prompt_template.invoke(
+            media_contents.append(
                 {
-                    "format_instructions": PydanticOutputParser(
-                        pydantic_object=JobBatchResponse
-                    ).get_format_instructions()
+                    "type": "media",
+                    "source_type": "base64",
+                    "data": file_info.base64_content,
+                    "mime_type": file_info.mime_type,
                 }
             )
+            file_descriptions.append(f"File {i + 1}: {file_info.file_name}")
 
-            llm_start_time = time.time()
-            try:
-                batch_response = self.llm.with_structured_output(JobBatchResponse).invoke(
-                    prompt_messages
-                )
-                llm_processing_time = time.time() - llm_start_time
-
-                for i, file_info in enumerate(file_infos):
-                    if i < len(batch_response.jobs) and batch_response.jobs[i] is not None:
-                        results.append(
-                            JobBatchResult(
-                                file_info=file_info,
-                                job_data=batch_response.jobs[i],
-                                success=True,
-                                error_message=None,
-                                processing_time_seconds=llm_processing_time / len(file_infos),
-                            )
-                        )
-                    else:
-                        results.append(
-                            JobBatchResult(
-                                file_info=file_info,
-                                job_data=None,
-                                success=False,
-                                error_message="No data returned from LLM for this file",
-                                processing_time_seconds=0.0,
-                            )
-                        )
-
-            except Exception as e:
-                logger.error(f"Error during LLM processing for batch {batch_id}: {e}")
-                for file_info in file_infos:
-                    results.append(
-                        JobBatchResult(
-                            file_info=file_info,
-                            job_data=None,
-                            success=False,
-                            error_message=f"LLM processing error: {str(e)}",
-                            processing_time_seconds=0.0,
-                        )
-                    )
-
-        except Exception as e:
-            logger.error(f"Critical error in Job batch processing {batch_id}: {e}")
-            return self._create_empty_job_batch_result(
-                batch_id, len(jd_paths), batch_start_time, str(e)
-            )
+        instruction_text = (
+            f"Please analyze these {len(file_infos)} {label} files and extract all information "
+            f"according to the structured format provided in the system message. "
+            f"Process each {label} independently and return structured data for all files in the '{response_key}' array.\n\n"
+            f"Files to process:\n" + "\n".join(file_descriptions)
+        )
 
-        batch_processing_time = time.time() - batch_start_time
-        successful_parses = sum(1 for result in results if result.success)
-        failed_parses = len(results) - successful_parses
+        media_contents.insert(0, {"type": "text", "text": instruction_text})
+        return HumanMessage(content=media_contents)
 
-        logger.info(
-            f"Completed Job batch {batch_id}: {successful_parses}/{len(results)} successful"
-        )
+    @staticmethod
+    def _estimate_tokens(file_infos: List[FileInfo]) -> int:
+        """Rough input token count of a batch request for the rate limiter
 
-        return JobBatchData(
-            batch_id=batch_id,
-            total_files=len(jd_paths),
-            successful_parses=successful_parses,
-            failed_parses=failed_parses,
-            batch_processing_time_seconds=batch_processing_time,
-            results=results,
-        )
+        Documents and images are billed per page or image, not by their size in bytes,
+        so every file counts as a fixed GEMINI_TOKENS_PER_FILE.
+        """
+        return len(file_infos) * settings.GEMINI_TOKENS_PER_FILE
 
     def _create_empty_cv_batch_result(
         self,
@@ -330,14 +319,7 @@ class GeminiParser:
         error_msg: str = "No valid files to process",
     ) -> CVBatchData:
         """Create an empty CV batch result for error cases"""
-        return CVBatchData(
-            batch_id=batch_id,
-            total_files=total_files,
-            successful_parses=0,
-            failed_parses=total_files,
-            batch_processing_time_seconds=time.time() - start_time,
-            results=[],
-        )
+        return self._empty_batch_data(_CV_BATCH, batch_id, total_files, start_time, error_msg)
 
     def _create_empty_job_batch_result(
         self,
@@ -347,7 +329,18 @@ class GeminiParser:
         error_msg: str = "No valid files to process",
     ) -> JobBatchData:
         """Create an empty Job batch result for error cases"""
-        return JobBatchData(
+        return self._empty_batch_data(_JOB_BATCH, batch_id, total_files, start_time, error_msg)
+
+    @staticmethod
+    def _empty_batch_data(
+        kind: _BatchKind,
+        batch_id: str,
+        total_files: int,
+        start_time: float,
+        error_msg: str = "No valid files to process",
+    ) -> Union[CVBatchData, JobBatchData]:
+        """Create an empty batch result of either kind for error cases"""
+        return kind.batch_type(
             batch_id=batch_id,
             total_files=total_files,
             successful_parses=0,
@@ -1,19 +1,63 @@
+import asyncio
+import os
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 
 from loguru import logger
 
-from src.backend.batch_processor import BatchProcessor
+from src.backend.batch_processor import BatchProcessor, BatchResult
 from src.backend.config import settings
 from src.backend.db_utils import (
-    save_candidate_to_database,
+    save_candidates_to_database,
     save_cv_batch_results_to_json,
     save_job_batch_results_to_json,
-    save_job_description_to_database,
+    save_job_descriptions_to_database,
 )
 from src.backend.models import BatchProcessingStats, CVBatchData, JobBatchData
 
 
+def _list_supported_files(directory: Path) -> List[Path]:
+    """List files in directory with a supported extension using a single scandir pass"""
+    supported_extensions = settings.SUPPORTED_CV_FORMATS["all"]
+    with os.scandir(directory) as entries:
+        return sorted(
+            Path(entry.path)
+            for entry in entries
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in supported_extensions
+        )
+
+
+def _save_cv_batch_to_database(batch: CVBatchData):
+    parsed = [file for file in batch.results if file.success and file.cv_data]
+    save_candidates_to_database(
+        [file.cv_data for file in parsed], [str(file.file_info.file_path) for file in parsed]
+    )
+
+
+def _save_job_batch_to_database(batch: JobBatchData):
+    parsed = [file for file in batch.results if file.success and file.job_data]
+    save_job_descriptions_to_database(
+        [file.job_data for file in parsed], [str(file.file_info.file_path) for file in parsed]
+    )
+
+
+async def _save_batches(
+    batches: AsyncIterator[Tuple[BatchProcessingStats, BatchResult]],
+    save_to_database: Callable[[BatchResult], None],
+    save_to_json: Callable[[BatchResult, str], Awaitable[None]],
+) -> Optional[BatchProcessingStats]:
+    """Persist batches as they stream in, so parsed documents are not held for the whole
+    session; returns the final session statistics (None if nothing was processed)
+    """
+    stats = None
+    async for stats, batch in batches:
+        if settings.SAVE_INTO_DB:
+            await asyncio.to_thread(save_to_database, batch)
+        if settings.SAVE_INTO_JSON:
+            await save_to_json(batch, settings.PROCESSED_DATA_DIR)
+    return stats
+
+
 def cvs_main():
     """
     |---------------------------------------------------------------------------|
@@ -28,8 +72,7 @@ def cvs_main():
     cv_files: List[Path] = []
     if cvs_directory.exists():
         logger.info(f"Reading CV files from directory: {cvs_directory}")
-        for ext in settings.SUPPORTED_CV_FORMATS["all"]:
-            cv_files.extend(list(cvs_directory.glob(f"*{ext}")))
+        cv_files = _list_supported_files(cvs_directory)
     else:
         logger.error(f"CV directory {cvs_directory} does not exist.")
         return
@@ -38,7 +81,7 @@ def cvs_main():
         logger.error(
             "No CV files found in the specified directory. make sure of the directory or supported formats."
         )
-        logger.warning(f"Supported formats are {settings.SUPPORTED_CV_FORMATS['all']}")
+        logger.warning(f"Supported formats are {sorted(settings.SUPPORTED_CV_FORMATS['all'])}")
         return
 
     logger.info("files to be processed:")
@@ -48,23 +91,20 @@ def cvs_main():
     # 3. Process the files in batches
     logger.info(f"Processing with batch size: {settings.BATCH_SIZE_CV}")
 
-    function_results = batch_processor.process_cv_files(
-        file_paths=cv_files,
-        batch_size=settings.BATCH_SIZE_CV,
-        max_size_mb=settings.MAX_FILE_SIZE_MB,
+    # 4. save result of each batch as soon as it is parsed
+    stats = asyncio.run(
+        _save_batches(
+            batch_processor.aiter_cv_batches(
+                file_paths=cv_files,
+                batch_size=settings.BATCH_SIZE_CV,
+                max_size_mb=settings.MAX_FILE_SIZE_MB,
+            ),
+            _save_cv_batch_to_database,
+            save_cv_batch_results_to_json,
+        )
     )
-    stats: BatchProcessingStats = function_results[0]
-    processed_cvs: List[CVBatchData] = function_results[1]
-
-    # 4. save result
-    if settings.SAVE_INTO_DB:
-        for batch in processed_cvs:
-            for file in batch.results:
-                save_candidate_to_database(file.cv_data, str(file.file_info.file_path))
-
-    if settings.SAVE_INTO_JSON:
-        for batch in processed_cvs:
-            save_cv_batch_results_to_json(batch, settings.PROCESSED_DATA_DIR)
+    if stats is None:
+        return
 
     # Display results
     logger.info("Processing completed!")
@@ -80,8 +120,6 @@ def cvs_main():
     )
     logger.info(f"average_batch_size: {stats.average_batch_size:.2f}")
 
-    # Data has already been saved above in the batch processing loop
-
 
 def jds_main():
     """
@@ -97,8 +135,7 @@ def jds_main():
     job_files: List[Path] = []
     if job_directory.exists():
         logger.info(f"Reading Job Description files from directory: {job_directory}")
-        for ext in settings.SUPPORTED_CV_FORMATS["all"]:
-            job_files.extend(list(job_directory.glob(f"*{ext}")))
+        job_files = _list_supported_files(job_directory)
     else:
         logger.error(f"Job Description directory {job_directory} does not exist.")
         return
@@ -107,7 +144,7 @@ def jds_main():
         logger.error(
             "No Job Description files found in the specified directory. make sure of the directory or supported formats."
         )
-        logger.warning(f"Supported formats are {settings.SUPPORTED_CV_FORMATS['all']}")
+        logger.warning(f"Supported formats are {sorted(settings.SUPPORTED_CV_FORMATS['all'])}")
         return
 
     logger.info("files to be processed:")
@@ -116,24 +153,21 @@ def jds_main():
 
     # 3. Process the files in batches
     logger.info(f"Processing with batch size: {settings.BATCH_SIZE_JOB}")
-    function_results = batch_processor.process_job_files(
-        file_paths=job_files,
-        batch_size=settings.BATCH_SIZE_JOB,
-        max_size_mb=settings.MAX_FILE_SIZE_MB,
-    )
-
-    stats: BatchProcessingStats = function_results[0]
-    processed_jds: List[JobBatchData] = function_results[1]
 
-    # 4. save result
-    if settings.SAVE_INTO_DB:
-        for batch in processed_jds:
-            for file in batch.results:
-                save_job_description_to_database(file.job_data, str(file.file_info.file_path))
-
-    if settings.SAVE_INTO_JSON:
-        for batch in processed_jds:
-            save_job_batch_results_to_json(batch, settings.PROCESSED_DATA_DIR)
+    # 4. save result of each batch as soon as it is parsed
+    stats = asyncio.run(
+        _save_batches(
+            batch_processor.aiter_job_batches(
+                file_paths=job_files,
+                batch_size=settings.BATCH_SIZE_JOB,
+                max_size_mb=settings.MAX_FILE_SIZE_MB,
+            ),
+            _save_job_batch_to_database,
+            save_job_batch_results_to_json,
+        )
+    )
+    if stats is None:
+        return
 
     # Display results
     logger.info("Processing completed!")
@@ -151,6 +185,10 @@ def jds_main():
     return stats
 
 
+async def run_all():
+    """Process CVs and job descriptions concurrently"""
+    await asyncio.gather(asyncio.to_thread(cvs_main), asyncio.to_thread(jds_main))
+
+
 if __name__ == "__main__":
-    # cvs_main()
-    jds_main()
+    asyncio.run(run_all())
@@ -0,0 +1,79 @@
+import hashlib
+import sqlite3
+from typing import Dict, List, Optional, Type
+
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+
+from src.backend.config import settings
+from src.backend.database import get_db_manager
+from src.backend.models import FileInfo
+
+
+class ParseCache:
+    """Parsed documents persisted in SQLite by the hash of the source file's content
+
+    Entries are keyed on sha256(document type, model, file content), so re-running the
+    pipeline over unchanged files reuses the earlier extraction instead of calling the LLM.
+    Lookups and stores are no-ops when PARSE_CACHE_ENABLED is off.
+    """
+
+    def __init__(self, document_model: Type[BaseModel], model_name: str):
+        self.document_model = document_model
+        self.model_name = model_name
+
+    def lookup(self, file_infos: List[FileInfo]) -> List[Optional[BaseModel]]:
+        """Cached document for each file, in input order (None on a miss)"""
+        if not settings.PARSE_CACHE_ENABLED or not file_infos:
+            return [None] * len(file_infos)
+
+        keys = [self._key(file_info) for file_info in file_infos]
+        documents: Dict[bytes, BaseModel] = {}
+        try:
+            with get_db_manager().get_read_connection() as conn:
+                placeholders = ", ".join("?" * len(keys))
+                rows = conn.execute(
+                    f"SELECT hash, data FROM parse_cache WHERE hash IN ({placeholders})", keys
+                ).fetchall()
+            for row in rows:
+                try:
+                    documents[row["hash"]] = self.document_model.model_validate_json(row["data"])
+                except ValidationError:
+                    # Written for an older schema; the file is simply parsed again
+                    pass
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read parse cache: {str(e)}")
+
+        if documents:
+            logger.info(
+                "Parse cache: {}/{} {} files already parsed",
+                len(documents),
+                len(file_infos),
+                self.document_model.__name__,
+            )
+        return [documents.get(key) for key in keys]
+
+    def store(self, file_infos: List[FileInfo], documents: List[BaseModel]):
+        """Cache the parsed document of each file"""
+        if not settings.PARSE_CACHE_ENABLED or not file_infos:
+            return
+
+        rows = [
+            (self._key(file_info), document.model_dump_json())
+            for file_info, document in zip(file_infos, documents)
+        ]
+        try:
+            with get_db_manager().get_connection() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO parse_cache (hash, data) VALUES (?, ?)", rows
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write parse cache: {str(e)}")
+
+    def _key(self, file_info: FileInfo) -> bytes:
+        digest = hashlib.sha256(
+            f"{self.document_model.__name__}\0{self.model_name}\0".encode("utf-8")
+        )
+        digest.update(file_info.base64_content.encode("ascii"))
+        return digest.digest()
@@ -157,8 +157,6 @@ For EACH certification:
 - Calculate experience years accurately for each individual CV
 
 Remember: Your goal is COMPREHENSIVE extraction with CONSISTENT normalization across ALL CVs in the batch. Process each CV thoroughly while maintaining efficiency for the entire batch.
-
-{format_instructions}
 """
 
 JOB_DESCRIPTION_PARSING_SYSTEM_PROMPT = """
@@ -340,6 +338,4 @@ Categorize skills into logical groups with clear distinction between required an
 - Calculate experience ranges accurately for each individual job posting
 
 Remember: Your goal is COMPREHENSIVE extraction with PRECISE classification of requirements across ALL job descriptions in the batch. Process each document thoroughly while maintaining efficiency for the entire batch.
-
-{format_instructions}
 """
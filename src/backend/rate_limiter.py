@@ -0,0 +1,67 @@
+import asyncio
+from collections import deque
+from threading import Lock
+import time
+from typing import Deque, Tuple
+
+from loguru import logger
+
+from src.backend.config import settings
+
+
+class SlidingWindowRateLimiter:
+    """Requests-per-minute and tokens-per-minute limiter over a sliding window
+
+    Callers await `acquire(tokens)` before each API call and are held back until both
+    budgets have room. State is guarded by a thread lock rather than asyncio primitives,
+    so one limiter can be shared by event loops running in different threads.
+    A limit of 0 disables that budget.
+    """
+
+    def __init__(self, rpm: int, tpm: int, window_seconds: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window_seconds = window_seconds
+        self._calls: Deque[Tuple[float, int]] = deque()  # (monotonic time, tokens)
+        self._tokens_in_window = 0
+        self._lock = Lock()
+
+    async def acquire(self, tokens: int = 0):
+        """Wait until a call of `tokens` estimated tokens fits in both budgets, then record it"""
+        while True:
+            delay = self._try_reserve(tokens)
+            if delay <= 0:
+                return
+            logger.debug("Rate limit reached, waiting {:.2f}s", delay)
+            await asyncio.sleep(delay)
+
+    def _try_reserve(self, tokens: int) -> float:
+        """Record the call and return 0, or return how long to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0][0] >= self.window_seconds:
+                self._tokens_in_window -= self._calls.popleft()[1]
+
+            delay = 0.0
+            if self.rpm > 0 and len(self._calls) >= self.rpm:
+                delay = self._calls[len(self._calls) - self.rpm][0] + self.window_seconds - now
+
+            # A single call larger than the whole budget only has to wait for an empty window
+            if self.tpm > 0 and self._calls and self._tokens_in_window + tokens > self.tpm:
+                freed = 0
+                for called_at, call_tokens in self._calls:
+                    freed += call_tokens
+                    if self._tokens_in_window - freed + tokens <= self.tpm:
+                        break
+                delay = max(delay, called_at + self.window_seconds - now)
+
+            if delay > 0:
+                return delay
+
+            self._calls.append((now, tokens))
+            self._tokens_in_window += tokens
+            return 0.0
+
+
+# Shared by every Gemini parser in the process, since they draw on the same API quota
+gemini_rate_limiter = SlidingWindowRateLimiter(settings.GEMINI_RPM, settings.GEMINI_TPM)
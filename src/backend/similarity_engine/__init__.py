@@ -2,6 +2,8 @@ from .base_similarity_metric import BaseSimilarityMetric
 from .certification_similarity import CertificationSimilarityMetric
 from .data_models import JobContext
 from .education_similarity import EducationSimilarityMetric
+from .embedding_cache import CachedEmbeddings
+from .embedding_index import CandidateEmbeddingIndex
 from .experience_similarity import ExperienceSimilarityMetric
 from .language_similarity import LanguageSimilarityMetric
 from .semantic_similarity import SemanticSimilarityMetric
@@ -20,4 +22,6 @@ __all__ = [
     "SenioritySimilarityMetric",
     "LanguageSimilarityMetric",
     "CertificationSimilarityMetric",
+    "CandidateEmbeddingIndex",
+    "CachedEmbeddings",
 ]
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List
+
+import numpy as np
 
 from src.backend.similarity_engine.data_models import JobContext
 
@@ -11,3 +13,23 @@ class BaseSimilarityMetric(ABC):
     def calculate(self, candidate: Dict, job_context: JobContext) -> float:
         """Calculate similarity score between candidate and job context"""
         pass
+
+    @staticmethod
+    def _years_of_experience(candidates: List[Dict]) -> np.ndarray:
+        """Years of experience of each candidate as one float array (missing counts as 0)"""
+        return np.array(
+            [candidate.get("years_of_experience", 0) or 0 for candidate in candidates],
+            dtype=np.float64,
+        )
+
+    @staticmethod
+    def _cosine_scores(matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each row of `matrix` with `vector`, as a [0, 1] score
+
+        Cosine similarity lies in [-1, 1] and maps linearly onto (1 + sim) / 2, so
+        orthogonal texts, and rows or vectors of zero norm, score 0.5.
+        """
+        # (N, D) matrix against the (D,) vector in a single BLAS call
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+        similarities = np.divide(matrix @ vector, norms, out=np.zeros_like(norms), where=norms > 0)
+        return np.clip((1.0 + similarities) / 2.0, 0.0, 1.0)
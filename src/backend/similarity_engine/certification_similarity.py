@@ -1,7 +1,8 @@
-from difflib import SequenceMatcher as SM
 from typing import Dict, List
 
 from loguru import logger
+import numpy as np
+from rapidfuzz import fuzz, process
 
 from src.backend.similarity_engine.base_similarity_metric import BaseSimilarityMetric
 from src.backend.similarity_engine.data_models import JobContext
@@ -15,37 +16,61 @@ class CertificationSimilarityMetric(BaseSimilarityMetric):
 
     def calculate(self, candidate: Dict, job_context: JobContext) -> float:
         """Calculate certification similarity using cached job requirements"""
+        return self.calculate_batch([candidate], job_context)[0]
+
+    def calculate_batch(self, candidates: List[Dict], job_context: JobContext) -> List[float]:
+        """Score every candidate's certifications against the job in one cdist call"""
         try:
-            candidate_certifications = self._extract_candidate_certifications(candidate)
             required_certifications = job_context.required_certifications
-
             if not required_certifications:
-                logger.debug("No certification requirements found for job")
-                return 0.9
-
-            if not candidate_certifications:
-                logger.debug("No certifications found for candidate")
-                return 0.0
-
-            matched_certifications = 0
-            total_required = len(required_certifications)
-
-            for required_cert in required_certifications:
-                if self._find_matching_certification(required_cert, candidate_certifications):
-                    matched_certifications += 1
-
-            certification_similarity = matched_certifications / max(total_required, 1)
-            logger.debug(
-                f"Certification similarity - Required: {total_required}, Matched: {matched_certifications}, Score: {certification_similarity:.4f}"
-            )
-            return min(certification_similarity, 1.0)
+                return [0.9] * len(candidates)
+
+            candidate_certifications = [
+                self._extract_candidate_certifications(candidate) for candidate in candidates
+            ]
+            flat_certifications = [cert for certs in candidate_certifications for cert in certs]
+            if not flat_certifications:
+                return [0.0] * len(candidates)
+
+            # Boilerplate certifications repeat across the pool; score each distinct one once
+            unique_certifications, inverse = np.unique(flat_certifications, return_inverse=True)
+
+            # (required, all candidate certs) match matrix; each candidate owns a column slice
+            cutoff = self.threshold * 100
+            matches = (
+                process.cdist(
+                    required_certifications,
+                    unique_certifications.tolist(),
+                    scorer=fuzz.ratio,
+                    score_cutoff=cutoff,
+                )
+                >= cutoff
+            )[:, inverse.ravel()]
+
+            scores = []
+            offset = 0
+            for certs in candidate_certifications:
+                if not certs:
+                    scores.append(0.0)
+                    continue
+
+                matched_certifications = int(
+                    np.any(matches[:, offset : offset + len(certs)], axis=1).sum()
+                )
+                offset += len(certs)
+                scores.append(min(matched_certifications / len(required_certifications), 1.0))
+            return scores
 
         except Exception as e:
             logger.error(f"Error calculating certification similarity: {e}")
-            return 0.5
+            return [0.5] * len(candidates)
 
     def _extract_candidate_certifications(self, candidate: Dict) -> List[str]:
-        """Extract certifications from candidate data"""
+        """Extract normalized certifications from candidate data, cached on the dict"""
+        cached = candidate.get("_norm_certs")
+        if cached is not None:
+            return cached
+
         certifications = []
         candidate_certs = candidate.get("certifications", []) or []
 
@@ -57,7 +82,8 @@ class CertificationSimilarityMetric(BaseSimilarityMetric):
             elif isinstance(cert, str):
                 certifications.append(cert.lower().strip())
 
-        return [cert for cert in certifications if cert]
+        candidate["_norm_certs"] = [cert for cert in certifications if cert]
+        return candidate["_norm_certs"]
 
     @staticmethod
     def extract_job_required_certifications(job: Dict) -> List[str]:
@@ -81,20 +107,3 @@ class CertificationSimilarityMetric(BaseSimilarityMetric):
                     certifications.append(cert.lower().strip())
 
         return [cert for cert in certifications if cert]
-
-    def _find_matching_certification(
-        self, required_cert: str, candidate_certifications: List[str]
-    ) -> bool:
-        """Find if a required certification has a match in candidate's certifications"""
-        if required_cert in candidate_certifications:
-            return True
-
-        for candidate_cert in candidate_certifications:
-            similarity = SM(None, required_cert, candidate_cert).ratio()
-            if similarity >= self.threshold:
-                logger.debug(
-                    f"Certification fuzzy match: '{required_cert}' <-> '{candidate_cert}' (similarity: {similarity:.3f})"
-                )
-                return True
-
-        return False
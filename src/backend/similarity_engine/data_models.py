@@ -6,7 +6,6 @@
 
 from typing import Any, Dict, List, Optional
 
-from langchain_core.vectorstores import InMemoryVectorStore
 from pydantic import BaseModel, ConfigDict
 
 
@@ -42,10 +41,13 @@ class JobContext(BaseModel):
     required_skills: List[str]
     job_responsibilities_text: str
     education_requirements: List[str]
+    required_degree_rank: Optional[int] = None
+    required_fields_of_study: List[str] = []
     required_languages: List[Dict[str, str]]
     required_certifications: List[str]
     min_years_experience: int
     max_years_experience: Optional[int]
     seniority_level: str
     job_summary: str
-    vector_store: Optional[InMemoryVectorStore] = None
+    responsibilities_embedding: Optional[Any] = None  # np.ndarray of the requirements text
+    summary_embedding: Optional[Any] = None  # np.ndarray of the job summary
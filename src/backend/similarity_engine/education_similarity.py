@@ -1,56 +1,127 @@
-from difflib import SequenceMatcher as SM
-from typing import Dict, List
+import re
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 
 from loguru import logger
+from rapidfuzz import fuzz
 
 from src.backend.similarity_engine.base_similarity_metric import BaseSimilarityMetric
 from src.backend.similarity_engine.data_models import JobContext
 
+DEGREE_RANK = MappingProxyType(
+    {"high school": 0, "associate": 1, "bachelor": 2, "master": 3, "phd": 4}
+)
+
+# Spellings of each degree level as they appear in CVs and job postings
+_DEGREE_PATTERNS = (
+    ("phd", re.compile(r"\b(ph\.?\s?d|doctor(ate)?|dphil)\b")),
+    ("master", re.compile(r"\b(master'?s?|m\.?sc?|mba|m\.?eng|m\.?a)\b")),
+    ("bachelor", re.compile(r"\b(bachelor'?s?|b\.?sc?|b\.?eng|b\.?a|undergraduate)\b")),
+    ("associate", re.compile(r"\bassociate'?s?\b")),
+    ("high school", re.compile(r"\b(high school|secondary school|ged)\b")),
+)
+_FIELD_PATTERN = re.compile(r"\bin\s+(.+)")
+
 
 class EducationSimilarityMetric(BaseSimilarityMetric):
-    """Education similarity calculation"""
+    """Education similarity calculation based on degree level and field of study"""
 
     def calculate(self, candidate: Dict, job_context: JobContext) -> float:
         """Calculate education similarity using cached job requirements"""
         try:
-            candidate_education = self._create_candidate_education_text(
-                candidate.get("education", []) or []
-            )
-            job_education_requirements = " ".join(job_context.education_requirements)
-
-            if not job_education_requirements:
+            if not job_context.education_requirements:
                 return 0.8
 
-            if not candidate_education:
+            candidate_rank, candidate_fields = self._candidate_education_profile(candidate)
+            if candidate_rank is None and not candidate_fields:
                 return 0.0
 
-            return SM(None, candidate_education, job_education_requirements).ratio()
+            scores = []
+            required_rank = job_context.required_degree_rank
+            if required_rank is not None:
+                if required_rank == 0:
+                    scores.append(1.0)
+                else:
+                    scores.append(min((candidate_rank or 0) / required_rank, 1.0))
+
+            if job_context.required_fields_of_study:
+                scores.append(
+                    max(
+                        (
+                            fuzz.token_set_ratio(candidate_field, required_field) / 100.0
+                            for candidate_field in candidate_fields
+                            for required_field in job_context.required_fields_of_study
+                        ),
+                        default=0.0,
+                    )
+                )
+
+            if not scores:
+                # Requirements we cannot parse into a level or a field: compare the raw text
+                return (
+                    fuzz.token_set_ratio(
+                        " ".join(candidate_fields), " ".join(job_context.education_requirements)
+                    )
+                    / 100.0
+                )
+
+            return sum(scores) / len(scores)
 
         except Exception as e:
             logger.error(f"Error calculating education similarity: {e}")
             return 0.0
 
-    def _create_candidate_education_text(self, candidate_education: List) -> str:
-        """Create a text representation of candidate education for embedding"""
-        education_parts = []
+    def _candidate_education_profile(self, candidate: Dict) -> Tuple[Optional[int], List[str]]:
+        """Highest degree rank and fields of study of a candidate, cached on the dict"""
+        profile = candidate.get("_norm_edu")
+        if profile is None:
+            ranks = []
+            fields = []
+            for edu in candidate.get("education", []) or []:
+                if isinstance(edu, dict):
+                    rank = self.degree_rank(edu.get("degree") or "")
+                    if rank is not None:
+                        ranks.append(rank)
+                    field = (edu.get("field_of_study") or "").lower().strip()
+                    if field:
+                        fields.append(field)
 
-        for edu in candidate_education:
-            if isinstance(edu, dict):
-                degree = edu.get("degree", "")
-                field = edu.get("field_of_study", "")
+            profile = (max(ranks, default=None), fields)
+            candidate["_norm_edu"] = profile
+        return profile
 
-                edu_text_parts = []
-                if degree:
-                    edu_text_parts.append(f"Degree: {degree}")
-                if field:
-                    edu_text_parts.append(f"Field: {field}")
-
-                if edu_text_parts:
-                    education_parts.append(". ".join(edu_text_parts))
-
-        return ". ".join(education_parts)
+    @staticmethod
+    def degree_rank(text: str) -> Optional[int]:
+        """Highest degree level mentioned in the text, None if no degree is recognised"""
+        text = text.lower()
+        for degree, pattern in _DEGREE_PATTERNS:
+            if pattern.search(text):
+                return DEGREE_RANK[degree]
+        return None
 
     @staticmethod
     def extract_job_education_requirements(job: Dict) -> List[str]:
         """Extract education requirements from job data - static method for caching"""
         return job.get("education_requirements", []) or []
+
+    @staticmethod
+    def extract_job_education_profile(requirements: List[str]) -> Tuple[Optional[int], List[str]]:
+        """Lowest acceptable degree rank and the fields of study named by the requirements"""
+        ranks = []
+        fields = []
+        for requirement in requirements:
+            requirement = requirement.lower()
+            # "Bachelor's or Master's" accepts a bachelor's, so the lowest level mentioned
+            # in a requirement is the bar it sets
+            mentioned = [
+                DEGREE_RANK[degree]
+                for degree, pattern in _DEGREE_PATTERNS
+                if pattern.search(requirement)
+            ]
+            if mentioned:
+                ranks.append(min(mentioned))
+            field_match = _FIELD_PATTERN.search(requirement)
+            if field_match:
+                fields.append(field_match.group(1).strip())
+
+        return min(ranks, default=None), fields
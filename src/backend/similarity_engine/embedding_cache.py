@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
+import sqlite3
+from typing import Dict, List, Optional
+
+from loguru import logger
+import numpy as np
+
+from src.backend.database import get_db_manager
+from src.backend.utils import get_embedding_model
+
+# Keep IN (...) lists below SQLite's default host parameter limit
+_LOOKUP_CHUNK_SIZE = 900
+# Embedding requests in flight at once when several queries miss the cache
+_QUERY_CONCURRENCY = 8
+
+
+class CachedEmbeddings:
+    """Embedding model wrapper that persists vectors by content hash in SQLite
+
+    Texts are keyed on sha256(model, task, text), so unchanged job and candidate texts
+    are never sent to the embedding API twice, even across restarts. Only cache misses
+    reach the wrapped model; results are returned in input order.
+    """
+
+    def __init__(self, embeddings, model_name: Optional[str] = None):
+        self.embeddings = embeddings
+        self.model_name = model_name or getattr(embeddings, "model", "")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, calling the model only for texts not cached yet"""
+        return self._embed(texts, "document", self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, calling the model only if the text is not cached yet"""
+        (embedding,) = self._embed(
+            [text], "query", lambda texts: [self.embeddings.embed_query(texts[0])]
+        )
+        return embedding
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries, calling the model concurrently for the texts not cached yet"""
+        return self._embed(texts, "query", self._embed_queries_concurrently)
+
+    def _embed_queries_concurrently(self, texts: List[str]) -> List[List[float]]:
+        # Queries are embedded one request per text, so overlap the requests
+        with ThreadPoolExecutor(max_workers=min(len(texts), _QUERY_CONCURRENCY)) as executor:
+            return list(executor.map(self.embeddings.embed_query, texts))
+
+    def _embed(self, texts: List[str], task: str, embed) -> List[List[float]]:
+        if not texts:
+            return []
+
+        keys = [self._key(task, text) for text in texts]
+        vectors = self._load(keys)
+
+        misses = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if misses:
+            logger.debug(
+                "Embedding cache: {} hits, {} misses", len(texts) - len(misses), len(misses)
+            )
+            computed = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(misses, embed(list(misses.values())))
+            }
+            self._store(computed)
+            vectors.update(computed)
+
+        return [vectors[key].tolist() for key in keys]
+
+    def _key(self, task: str, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model_name}\0{task}\0{text}".encode("utf-8")).digest()
+
+    @staticmethod
+    def _load(keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        vectors = {}
+        unique_keys = list(dict.fromkeys(keys))
+        try:
+            with get_db_manager().get_read_connection() as conn:
+                for start in range(0, len(unique_keys), _LOOKUP_CHUNK_SIZE):
+                    chunk = unique_keys[start : start + _LOOKUP_CHUNK_SIZE]
+                    placeholders = ", ".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT hash, dim, vec FROM embedding_cache WHERE hash IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                    for row in rows:
+                        vector = np.frombuffer(row["vec"], dtype=np.float32)
+                        if vector.size == row["dim"]:
+                            vectors[row["hash"]] = vector
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read embedding cache: {str(e)}")
+        return vectors
+
+    @staticmethod
+    def _store(vectors: Dict[bytes, np.ndarray]):
+        rows = [(key, vector.size, vector.tobytes()) for key, vector in vectors.items()]
+        try:
+            with get_db_manager().get_connection() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (hash, dim, vec) VALUES (?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            # The vectors were still computed; they just get recomputed next time
+            logger.warning(f"Could not write embedding cache: {str(e)}")
+
+
+@lru_cache(maxsize=None)
+def get_cached_embedding_model(model="models/embedding-001") -> CachedEmbeddings:
+    return CachedEmbeddings(get_embedding_model(model), model)
@@ -0,0 +1,53 @@
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+import numpy as np
+
+from src.backend.crud import CandidateService
+from src.backend.utils import deserialize_embedding
+
+
+class CandidateEmbeddingIndex:
+    """In-memory matrix of all stored candidate summary embeddings
+
+    The snapshot is rebuilt only when the embeddings table changes, so matching
+    requests look vectors up in memory instead of reading and decoding blobs.
+    """
+
+    def __init__(self):
+        self._version: Optional[int] = None
+        self._snapshot: Tuple[Dict[int, int], np.ndarray] = ({}, np.empty((0, 0), np.float32))
+        self._lock = Lock()
+
+    def refresh(self):
+        """Reload the snapshot if candidate embeddings were added or replaced"""
+        version = CandidateService.get_candidate_embeddings_version()
+        if version is not None and version == self._version:
+            return
+
+        with self._lock:
+            if version is not None and version == self._version:
+                return
+
+            embeddings = CandidateService.get_all_candidate_embeddings()
+            if embeddings:
+                matrix = np.vstack([deserialize_embedding(blob) for blob in embeddings.values()])
+            else:
+                matrix = np.empty((0, 0), np.float32)
+
+            self._snapshot = (
+                {candidate_id: row for row, candidate_id in enumerate(embeddings)},
+                matrix,
+            )
+            self._version = version
+            logger.info(f"Loaded {len(embeddings)} candidate embeddings into memory")
+
+    def lookup(self, candidate_ids: List[int]) -> Tuple[List[int], np.ndarray]:
+        """Return the candidate IDs that have an embedding and their rows, in input order"""
+        self.refresh()
+        row_by_id, matrix = self._snapshot
+
+        found_ids = [candidate_id for candidate_id in candidate_ids if candidate_id in row_by_id]
+        rows = [row_by_id[candidate_id] for candidate_id in found_ids]
+        return found_ids, matrix[rows] if rows else np.empty((0, 0), np.float32)
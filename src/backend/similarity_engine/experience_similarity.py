@@ -1,114 +1,197 @@
-from difflib import SequenceMatcher as SM
-from typing import Dict
+from typing import Dict, List, Optional
 
-from langchain_core.vectorstores import InMemoryVectorStore
 from loguru import logger
+import numpy as np
+from rapidfuzz import fuzz, process
 
+from src.backend.config import settings
 from src.backend.similarity_engine.base_similarity_metric import BaseSimilarityMetric
 from src.backend.similarity_engine.data_models import JobContext
-from src.backend.utils import get_embedding_model
+from src.backend.similarity_engine.embedding_cache import get_cached_embedding_model
 
 
 class ExperienceSimilarityMetric(BaseSimilarityMetric):
     """Experience similarity calculation based on years and relevance"""
 
     def __init__(self, embeddings=None):
-        self.embeddings = embeddings or get_embedding_model()
+        self.embeddings = embeddings or get_cached_embedding_model()
 
     def calculate(self, candidate: Dict, job_context: JobContext) -> float:
         """Calculate experience similarity using cached job data"""
-        candidate_years = candidate.get("years_of_experience", 0) or 0
-        min_required = job_context.min_years_experience
-        max_preferred = job_context.max_years_experience
-
-        # Base score on years of experience
-        if candidate_years >= min_required:
-            if max_preferred and candidate_years <= max_preferred:
-                years_score = 1.0
-            elif max_preferred:
-                years_score = max(0.8, 1.0 - (candidate_years - max_preferred) * 0.05)
-            else:
-                years_score = 1.0
+        return self.calculate_batch([candidate], job_context)[0]
+
+    def calculate_batch(
+        self,
+        candidates: List[Dict],
+        job_context: JobContext,
+        embeddings: Optional[Dict[str, np.ndarray]] = None,
+    ) -> List[float]:
+        """Score many candidates, comparing all their responsibilities to the job in one matmul
+
+        `embeddings` is the lookup from precompute_candidate_embeddings; it is built here
+        when the caller has not already done so.
+        """
+        responsibility_scores = self._calculate_responsibility_similarities(
+            candidates, job_context, embeddings
+        )
+        relevance_scores = self._calculate_experience_relevance(
+            candidates, job_context, responsibility_scores
+        )
+        years_scores = self._score_years(
+            self._years_of_experience(candidates),
+            job_context.min_years_experience,
+            job_context.max_years_experience,
+        )
+        return ((years_scores * 0.6) + (relevance_scores * 0.4)).tolist()
+
+    @staticmethod
+    def _score_years(
+        years: np.ndarray, min_required: int, max_preferred: Optional[int]
+    ) -> np.ndarray:
+        """Score years of experience against the job's range for all candidates at once"""
+        if max_preferred:
+            above_min = np.where(
+                years <= max_preferred,
+                1.0,
+                np.maximum(0.8, 1.0 - (years - max_preferred) * 0.05),
+            )
         else:
-            years_score = max(0.0, candidate_years / max(min_required, 1))
-
-        relevance_score = self._calculate_experience_relevance(candidate, job_context)
-        return (years_score * 0.6) + (relevance_score * 0.4)
-
-    def _calculate_experience_relevance(self, candidate: Dict, job_context: JobContext) -> float:
-        """Calculate relevance using cached job responsibilities text"""
-        candidate_exp = candidate.get("experience", []) or []
-        if not candidate_exp:
-            return 0.3
-
-        relevance_score = 0.0
-        total_positions = len(candidate_exp)
-
-        for exp in candidate_exp:
-            if isinstance(exp, dict):
-                position_relevance = self._calculate_position_relevance(exp, job_context)
-                relevance_score += position_relevance
-
-        return relevance_score / max(total_positions, 1)
-
-    def _calculate_position_relevance(self, experience: Dict, job_context: JobContext) -> float:
-        """Calculate relevance of a single position to the job using cached data"""
-        exp_title = experience.get("job_title", "").lower()
-        job_title = job_context.job_data.get("job_title", "").lower()
-
-        title_score = 0.0
-        if exp_title and job_title:
-            similarity = SM(None, exp_title, job_title).ratio()
-            title_score = similarity
-            logger.debug(
-                f"Title similarity: '{exp_title}' <-> '{job_title}' (similarity: {similarity:.3f})"
+            above_min = np.ones_like(years)
+        below_min = np.maximum(0.0, years / max(min_required, 1))
+        return np.where(years >= min_required, above_min, below_min)
+
+    def _calculate_experience_relevance(
+        self,
+        candidates: List[Dict],
+        job_context: JobContext,
+        responsibility_scores: List[List[float]],
+    ) -> np.ndarray:
+        """Average position relevance per candidate over flat (candidate x position) arrays
+
+        Each position scores min(0.6 * title + 0.4 * responsibilities, 1); titles are
+        fuzzy-matched in one cdist call and the per-candidate means come from a bincount.
+        """
+        job_title = (job_context.job_data.get("job_title") or "").lower()
+
+        owners = []
+        titles = []
+        position_responsibility_scores = []
+        position_counts = np.zeros(len(candidates), dtype=np.float64)
+        for candidate_index, (candidate, scores) in enumerate(
+            zip(candidates, responsibility_scores)
+        ):
+            candidate_exp = candidate.get("experience", []) or []
+            position_counts[candidate_index] = len(candidate_exp)
+            for exp, exp_title, resp_score in zip(
+                candidate_exp, self._normalized_titles(candidate), scores
+            ):
+                # Non-dict entries still count as positions but add no relevance
+                if isinstance(exp, dict):
+                    owners.append(candidate_index)
+                    titles.append(exp_title)
+                    position_responsibility_scores.append(resp_score)
+
+        title_scores = np.zeros(len(titles), dtype=np.float64)
+        if titles and job_title:
+            similarities = (
+                process.cdist(titles, [job_title], scorer=fuzz.ratio, dtype=np.float64)[:, 0]
+                / 100.0
             )
-
-        resp_score = self._calculate_responsibility_similarity(experience, job_context)
-        return min((title_score * 0.6) + (resp_score * 0.4), 1.0)
-
-    def _calculate_responsibility_similarity(
-        self, experience: Dict, job_context: JobContext
-    ) -> float:
-        """Calculate responsibility similarity using cached vector store"""
+            title_scores = np.where([bool(title) for title in titles], similarities, 0.0)
+
+        position_scores = np.minimum(
+            title_scores * 0.6 + np.asarray(position_responsibility_scores) * 0.4, 1.0
+        )
+        relevance_sums = np.bincount(
+            np.asarray(owners, dtype=np.intp), weights=position_scores, minlength=len(candidates)
+        )
+        return np.where(position_counts > 0, relevance_sums / np.maximum(position_counts, 1), 0.3)
+
+    def precompute_candidate_embeddings(
+        self, candidates: List[Dict], job_context: JobContext
+    ) -> Dict[str, np.ndarray]:
+        """Embed the responsibilities of every candidate position for this job in bulk
+
+        Texts are embedded as queries, like the job text they are compared with; identical
+        texts are embedded once and requests are chunked to EMBEDDING_BATCH_SIZE.
+        Returns a responsibilities text -> embedding lookup for the current scoring call.
+        """
+        if job_context.responsibilities_embedding is None:
+            return {}
+
+        texts = list(
+            dict.fromkeys(
+                self._responsibilities_text(exp)
+                for candidate in candidates
+                for exp in candidate.get("experience", []) or []
+                if isinstance(exp, dict) and exp.get("responsibilities")
+            )
+        )
+
+        embeddings = {}
+        batch_size = settings.EMBEDDING_BATCH_SIZE
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start : start + batch_size]
+            vectors = np.asarray(self.embeddings.embed_queries(chunk), dtype=np.float32)
+            embeddings.update(zip(chunk, vectors))
+        return embeddings
+
+    def _calculate_responsibility_similarities(
+        self,
+        candidates: List[Dict],
+        job_context: JobContext,
+        embeddings: Optional[Dict[str, np.ndarray]] = None,
+    ) -> List[List[float]]:
+        """Score each position's responsibilities against the cached job text embedding
+
+        Returns one list per candidate, aligned with its experience entries.
+        """
+        scores = [[0.0] * len(candidate.get("experience", []) or []) for candidate in candidates]
         try:
-            candidate_responsibilities = experience.get("responsibilities", [])
-            if not candidate_responsibilities:
-                logger.debug("No candidate responsibilities found")
-                return 0.0
-
-            candidate_resp_text = " ".join(candidate_responsibilities)
-
-            if not job_context.job_responsibilities_text:
+            job_embedding = job_context.responsibilities_embedding
+            if job_embedding is None:
                 logger.debug("No job context found")
-                return 0.0
-
-            # Use cached vector store if available
-            if job_context.vector_store is None:
-                documents = [f"Job requirements: {job_context.job_responsibilities_text}"]
-                job_context.vector_store = InMemoryVectorStore(self.embeddings)
-                job_context.vector_store.add_texts(
-                    texts=documents, metadatas=[{"type": "job", "source": "requirements"}]
-                )
-
-            similarity_results = job_context.vector_store.similarity_search_with_score(
-                query=candidate_resp_text, k=1
-            )
+                return scores
 
-            if similarity_results:
-                _, distance_score = similarity_results[0]
-                similarity_score = max(0.0, 1.0 - (distance_score / 2.0))
-                logger.debug(
-                    f"Responsibility similarity - Distance: {distance_score:.4f}, Similarity: {similarity_score:.4f}"
-                )
-                return min(similarity_score, 1.0)
-            else:
-                logger.debug("No similarity results found")
-                return 0.0
+            if embeddings is None:
+                embeddings = self.precompute_candidate_embeddings(candidates, job_context)
+            if not embeddings:
+                logger.debug("No candidate responsibilities found")
+                return scores
+
+            # Each unique responsibilities text is scored once
+            texts = list(embeddings)
+            matrix = np.stack([embeddings[text] for text in texts])
+            similarity_scores = self._cosine_scores(matrix, job_embedding)
+            score_by_text = dict(zip(texts, similarity_scores.tolist()))
+
+            for candidate_index, candidate in enumerate(candidates):
+                for exp_index, exp in enumerate(candidate.get("experience", []) or []):
+                    if isinstance(exp, dict) and exp.get("responsibilities"):
+                        scores[candidate_index][exp_index] = score_by_text.get(
+                            self._responsibilities_text(exp), 0.0
+                        )
+            return scores
 
         except Exception as e:
             logger.error(f"Error calculating responsibility similarity: {e}")
-            return 0.0
+            return scores
+
+    @staticmethod
+    def _normalized_titles(candidate: Dict) -> List[str]:
+        """Lowercased job title of each position, cached on the candidate dict"""
+        titles = candidate.get("_norm_exp_titles")
+        if titles is None:
+            titles = [
+                (exp.get("job_title") or "").lower() if isinstance(exp, dict) else ""
+                for exp in candidate.get("experience", []) or []
+            ]
+            candidate["_norm_exp_titles"] = titles
+        return titles
+
+    @staticmethod
+    def _responsibilities_text(experience: Dict) -> str:
+        return " ".join(experience["responsibilities"])
 
     @staticmethod
     def extract_job_responsibilities_and_description(job: Dict) -> str:
@@ -1,7 +1,7 @@
-from difflib import SequenceMatcher as SM
 from typing import Dict, List
 
 from loguru import logger
+from rapidfuzz import fuzz
 
 from src.backend.similarity_engine.base_similarity_metric import BaseSimilarityMetric
 from src.backend.similarity_engine.data_models import JobContext
@@ -35,7 +35,10 @@ class LanguageSimilarityMetric(BaseSimilarityMetric):
 
             language_similarity = total_score / max(total_requirements, 1)
             logger.debug(
-                f"Language similarity - Required: {len(required_languages)}, Candidate has: {len(candidate_languages)}, Score: {language_similarity:.4f}"
+                "Language similarity - Required: {}, Candidate has: {}, Score: {:.4f}",
+                len(required_languages),
+                len(candidate_languages),
+                language_similarity,
             )
             return min(language_similarity, 1.0)
 
@@ -111,7 +114,7 @@ class LanguageSimilarityMetric(BaseSimilarityMetric):
             candidate_name = candidate_lang["language"]
             candidate_proficiency = candidate_lang.get("proficiency", "basic")
 
-            name_similarity = SM(None, required_name, candidate_name).ratio()
+            name_similarity = fuzz.ratio(required_name, candidate_name) / 100.0
 
             if name_similarity >= 0.8:
                 candidate_level_score = proficiency_levels.get(candidate_proficiency, 1)
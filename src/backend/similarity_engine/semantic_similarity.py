@@ -1,7 +1,7 @@
-from typing import Dict
+from typing import Dict, List
 
-from langchain_core.vectorstores import InMemoryVectorStore
 from loguru import logger
+import numpy as np
 
 from src.backend.similarity_engine.base_similarity_metric import BaseSimilarityMetric
 from src.backend.similarity_engine.data_models import JobContext
@@ -15,29 +15,35 @@ class SemanticSimilarityMetric(BaseSimilarityMetric):
         self.embeddings = embeddings or get_embedding_model()
 
     def calculate(self, candidate: Dict, job_context: JobContext) -> float:
-        """Calculate semantic similarity using cached job summary"""
-        try:
-            candidate_summary = candidate.get("summary")
-            job_summary = job_context.job_summary
-
-            if not candidate_summary or not job_summary:
-                return 0.5
+        """Calculate semantic similarity using the cached job summary embedding"""
+        return self.calculate_batch([candidate], job_context)[0]
 
-            vector_store = InMemoryVectorStore(self.embeddings)
-            documents = [job_summary]
-            vector_store.add_texts(texts=documents, metadatas=[{"type": "job"}])
+    def calculate_batch(self, candidates: List[Dict], job_context: JobContext) -> List[float]:
+        """Score every candidate summary against the job summary in one matrix product"""
+        scores = [0.5] * len(candidates)
+        try:
+            job_embedding = job_context.summary_embedding
+            if job_embedding is None:
+                return scores
 
-            similarity_results = vector_store.similarity_search_with_score(
-                query=candidate_summary, k=1
-            )
+            indices = [i for i, candidate in enumerate(candidates) if candidate.get("summary")]
+            if not indices:
+                return scores
 
-            if similarity_results:
-                _, distance_score = similarity_results[0]
-                similarity_score = max(0.0, 1.0 - (distance_score / 2.0))
-                return min(similarity_score, 1.0)
+            matrix = np.vstack([self._get_candidate_embedding(candidates[i]) for i in indices])
+            similarity_scores = self._cosine_scores(matrix, job_embedding)
 
-            return 0.5
+            for i, score in zip(indices, similarity_scores.tolist()):
+                scores[i] = score
+            return scores
 
         except Exception as e:
             logger.error(f"Error calculating semantic similarity: {e}")
-            return 0.5
+            return [0.5] * len(candidates)
+
+    def _get_candidate_embedding(self, candidate: Dict) -> np.ndarray:
+        """Use the embedding precomputed at ingest, embedding the summary only as a fallback"""
+        stored_embedding = candidate.get("summary_embedding")
+        if stored_embedding is not None:
+            return stored_embedding
+        return np.asarray(self.embeddings.embed_query(candidate["summary"]), dtype=np.float32)
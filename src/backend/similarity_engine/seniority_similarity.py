@@ -1,10 +1,25 @@
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, List
 
 from loguru import logger
+import numpy as np
 
 from src.backend.similarity_engine.base_similarity_metric import BaseSimilarityMetric
 from src.backend.similarity_engine.data_models import JobContext
 
+# (min, max) years of experience expected for each job seniority level
+SENIORITY_RANGES = MappingProxyType(
+    {
+        "entry-level": (0, 2),
+        "junior": (0, 3),
+        "mid-level": (3, 7),
+        "senior": (7, 15),
+        "executive": (15, 100),
+        "lead": (5, 100),
+        "principal": (10, 100),
+    }
+)
+
 
 class SenioritySimilarityMetric(BaseSimilarityMetric):
     """Seniority level compatibility calculation"""
@@ -16,18 +31,9 @@ class SenioritySimilarityMetric(BaseSimilarityMetric):
             job_seniority = job_context.seniority_level.lower()
             job_min_years = job_context.min_years_experience
 
-            seniority_ranges = {
-                "entry-level": (0, 2),
-                "junior": (0, 3),
-                "mid-level": (3, 7),
-                "senior": (7, 15),
-                "executive": (15, 100),
-                "lead": (5, 100),
-                "principal": (10, 100),
-            }
-
-            if job_seniority in seniority_ranges:
-                min_years, max_years = seniority_ranges[job_seniority]
+            ranges = SENIORITY_RANGES.get(job_seniority)
+            if ranges is not None:
+                min_years, max_years = ranges
                 if min_years <= candidate_years <= max_years:
                     return 1.0
                 elif candidate_years < min_years:
@@ -46,3 +52,29 @@ class SenioritySimilarityMetric(BaseSimilarityMetric):
         except Exception as e:
             logger.error(f"Error calculating seniority match: {e}")
             return 0.8
+
+    def calculate_batch(self, candidates: List[Dict], job_context: JobContext) -> List[float]:
+        """Score seniority for many candidates in one vectorized pass over their years"""
+        try:
+            years = self._years_of_experience(candidates)
+        except (TypeError, ValueError):
+            return [self.calculate(candidate, job_context) for candidate in candidates]
+
+        ranges = SENIORITY_RANGES.get(job_context.seniority_level.lower())
+        job_min_years = job_context.min_years_experience
+
+        if ranges is not None:
+            min_years, max_years = ranges
+            scores = np.where(
+                years < min_years,
+                np.maximum(0.3, years / max(min_years, 1)),
+                np.where(
+                    years > max_years, np.maximum(0.7, 1.0 - (years - max_years) * 0.05), 1.0
+                ),
+            )
+        elif job_min_years > 0:
+            scores = np.where(years >= job_min_years, 1.0, np.maximum(0.3, years / job_min_years))
+        else:
+            scores = np.full(len(years), 0.8)
+
+        return scores.tolist()
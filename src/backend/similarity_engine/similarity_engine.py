@@ -1,25 +1,43 @@
-from typing import Dict, List, Optional
+from threading import Lock
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from loguru import logger
+import numpy as np
 
+from src.backend.config import settings
 from src.backend.crud import CandidateService, JobService
 from src.backend.similarity_engine.certification_similarity import CertificationSimilarityMetric
 from src.backend.similarity_engine.data_models import JobContext, SimilarityScore
 from src.backend.similarity_engine.education_similarity import EducationSimilarityMetric
+from src.backend.similarity_engine.embedding_cache import get_cached_embedding_model
+from src.backend.similarity_engine.embedding_index import CandidateEmbeddingIndex
 from src.backend.similarity_engine.experience_similarity import ExperienceSimilarityMetric
 from src.backend.similarity_engine.language_similarity import LanguageSimilarityMetric
 from src.backend.similarity_engine.semantic_similarity import SemanticSimilarityMetric
 from src.backend.similarity_engine.seniority_similarity import SenioritySimilarityMetric
 from src.backend.similarity_engine.skills_similarity import SkillsSimilarityMetric
-from src.backend.utils import get_embedding_model
+
+DEFAULT_WEIGHTS = {
+    "skills": 0.30,
+    "experience": 0.25,
+    "education": 0.15,
+    "language": 0.03,
+    "certification": 0.02,
+    "semantic": 0.05,
+    "seniority": 0.02,
+}
 
 
 class AdvancedSimilarityEngine:
     """Advanced similarity engine using multiple metric classes for candidate-job matching with caching"""
 
     def __init__(self):
-        self.embeddings = get_embedding_model()
-        self._job_context_cache: Dict[int, JobContext] = {}
+        self.embeddings = get_cached_embedding_model()
+        # job_id -> (job updated_at, last checked (monotonic), context)
+        self._job_context_cache: Dict[int, Tuple[Any, float, JobContext]] = {}
+        self._job_context_lock = Lock()
+        self.embedding_index = CandidateEmbeddingIndex()
 
         # Initialize metric classes
         self.skills_metric = SkillsSimilarityMetric()
@@ -30,101 +48,282 @@ class AdvancedSimilarityEngine:
         self.language_metric = LanguageSimilarityMetric()
         self.certification_metric = CertificationSimilarityMetric()
 
-    def preprocess_job(self, job_id: int) -> JobContext:
-        """Preprocess and cache job data for efficient comparison with multiple candidates"""
-        if job_id in self._job_context_cache:
-            return self._job_context_cache[job_id]
-
-        job = JobService.get_job(job_id)
-        if not job:
-            logger.error(f"Could not find job {job_id}")
-            raise ValueError(f"Job {job_id} not found")
-
-        logger.info(f"Preprocessing job: {job.get('job_title', 'Unknown')} (ID: {job_id})")
-
-        # Extract and cache all job-related data
-        job_context = JobContext(
-            job_id=job_id,
-            job_data=job,
-            required_skills=self.skills_metric.extract_job_required_skills(job),
-            job_responsibilities_text=self.experience_metric.extract_job_responsibilities_and_description(
-                job
-            ),
-            education_requirements=self.education_metric.extract_job_education_requirements(job),
-            required_languages=self.language_metric.extract_job_required_languages(job),
-            required_certifications=self.certification_metric.extract_job_required_certifications(
-                job
-            ),
-            min_years_experience=job.get("min_years_experience", 0) or 0,
-            max_years_experience=job.get("max_years_experience"),
-            seniority_level=job.get("seniority_level", "") or "",
-            job_summary=job.get("job_summary", "") or "",
-        )
+    def preprocess_job(self, job_id: int, job: Optional[Dict] = None) -> JobContext:
+        """Preprocess and cache job data for efficient comparison with multiple candidates
+
+        Contexts are keyed on the job's updated_at, so edits rebuild them. Within
+        JOB_CONTEXT_TTL_SECONDS a cached context is reused without touching the database
+        unless the caller passes a freshly loaded `job`. Safe to call from several threads.
+        """
+        # Held for the whole lookup and build: matching chunks run on several worker threads,
+        # and they must neither build the same context twice nor evict while another inserts
+        with self._job_context_lock:
+            cached = self._job_context_cache.get(job_id)
+            if (
+                cached is not None
+                and job is None
+                and time.monotonic() - cached[1] < settings.JOB_CONTEXT_TTL_SECONDS
+            ):
+                return cached[2]
+
+            if job is None:
+                job = JobService.get_job(job_id)
+                if not job:
+                    logger.error(f"Could not find job {job_id}")
+                    raise ValueError(f"Job {job_id} not found")
+
+            version = job.get("updated_at")
+            if cached is not None and cached[0] == version:
+                self._job_context_cache[job_id] = (version, time.monotonic(), cached[2])
+                return cached[2]
+
+            logger.info(f"Preprocessing job: {job.get('job_title', 'Unknown')} (ID: {job_id})")
+
+            # Extract and cache all job-related data
+            education_requirements = self.education_metric.extract_job_education_requirements(job)
+            required_degree_rank, required_fields_of_study = (
+                self.education_metric.extract_job_education_profile(education_requirements)
+            )
+            job_context = JobContext(
+                job_id=job_id,
+                job_data=job,
+                required_skills=self.skills_metric.extract_job_required_skills(job),
+                job_responsibilities_text=self.experience_metric.extract_job_responsibilities_and_description(
+                    job
+                ),
+                education_requirements=education_requirements,
+                required_degree_rank=required_degree_rank,
+                required_fields_of_study=required_fields_of_study,
+                required_languages=self.language_metric.extract_job_required_languages(job),
+                required_certifications=self.certification_metric.extract_job_required_certifications(
+                    job
+                ),
+                min_years_experience=job.get("min_years_experience", 0) or 0,
+                max_years_experience=job.get("max_years_experience"),
+                seniority_level=job.get("seniority_level", "") or "",
+                job_summary=job.get("job_summary", "") or "",
+            )
+
+            if job_context.job_responsibilities_text:
+                job_context.responsibilities_embedding = self.get_job_embedding(
+                    f"Job requirements: {job_context.job_responsibilities_text}"
+                )
+            if job_context.job_summary:
+                job_context.summary_embedding = self.get_job_embedding(job_context.job_summary)
+
+            # Cache the job context, evicting the oldest entry when full
+            self._job_context_cache.pop(job_id, None)
+            if len(self._job_context_cache) >= settings.JOB_CONTEXT_CACHE_SIZE:
+                self._job_context_cache.pop(next(iter(self._job_context_cache)))
+            self._job_context_cache[job_id] = (version, time.monotonic(), job_context)
+            logger.info(f"Job {job_id} preprocessed and cached successfully")
+
+            return job_context
+
+    def get_job_embedding(self, text: str) -> np.ndarray:
+        """Embed job text; the persistent embedding cache keys it on the text's content hash,
+        so unchanged text is never re-embedded and edited text is"""
+        return np.asarray(self.embeddings.embed_documents([text])[0], dtype=np.float32)
 
-        # Cache the job context
-        self._job_context_cache[job_id] = job_context
-        logger.info(f"Job {job_id} preprocessed and cached successfully")
+    def shortlist_candidates(self, candidate_ids: List[int], job_id: int, size: int) -> List[int]:
+        """Keep the `size` candidates whose summary embedding is closest to the job summary
 
-        return job_context
+        Candidates without a stored embedding cannot be ranked and are always kept.
+        """
+        if len(candidate_ids) <= size:
+            return candidate_ids
+
+        job_embedding = self.preprocess_job(job_id).summary_embedding
+        if job_embedding is None:
+            return candidate_ids
+
+        ranked_ids, matrix = self.embedding_index.lookup(candidate_ids)
+        if len(ranked_ids) <= size:
+            return candidate_ids
+
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(job_embedding)
+        similarities = np.divide(
+            matrix @ job_embedding, norms, out=np.zeros_like(norms), where=norms > 0
+        )
+        top_indices = np.argpartition(-similarities, size - 1)[:size]
+
+        shortlisted = set(candidate_ids).difference(ranked_ids)
+        shortlisted.update(ranked_ids[i] for i in top_indices.tolist())
+        logger.info(
+            f"Shortlisted {len(shortlisted)}/{len(candidate_ids)} candidates for job {job_id}"
+        )
+        return [candidate_id for candidate_id in candidate_ids if candidate_id in shortlisted]
 
     def calculate_similarity_batch(
-        self, candidate_ids: List[int], job_id: int, weights: Optional[Dict[str, float]] = None
+        self,
+        candidate_ids: List[int],
+        job_id: int,
+        weights: Optional[Dict[str, float]] = None,
+        min_score: float = 0.0,
     ) -> List[SimilarityScore]:
         """Calculate similarity for multiple candidates against a single job (optimized)"""
-        # Preprocess job once for all candidates
-        job_context = self.preprocess_job(job_id)
+        # Load every candidate in one query instead of one round-trip per candidate
+        candidates = CandidateService.get_candidates_with_similarity_fields(candidate_ids)
+        scores = iter(
+            self.calculate_similarity_batch_with_candidates(
+                list(candidates.values()), job_id, weights, min_score
+            )
+        )
 
         results = []
         for candidate_id in candidate_ids:
-            score = self._calculate_similarity_with_context(candidate_id, job_context, weights)
-            results.append(score)
+            if candidate_id not in candidates:
+                logger.error(f"Could not find candidate {candidate_id}")
+                results.append(self._create_empty_score())
+                continue
+            results.append(next(scores))
 
         return results
 
+    def calculate_similarity_batch_with_candidates(
+        self,
+        candidates: List[Dict],
+        job_id: int,
+        weights: Optional[Dict[str, float]] = None,
+        min_score: float = 0.0,
+    ) -> List[SimilarityScore]:
+        """Calculate similarity for already-loaded candidate records against a single job
+
+        Metrics run cheapest first. Before each embedding-backed stage, candidates whose
+        best possible overall score is already below `min_score` are dropped from it and
+        score 0.0 on the skipped metrics, so they still fall below the threshold.
+        """
+        # Preprocess job once for all candidates
+        job_context = self.preprocess_job(job_id)
+        weights = weights or DEFAULT_WEIGHTS
+        self._attach_summary_embeddings(candidates)
+
+        scores: Dict[str, List[float]] = {
+            # Years-based seniority scoring is plain arithmetic, vectorized over the pool
+            "seniority": self.seniority_metric.calculate_batch(candidates, job_context),
+            "skills": [self.skills_metric.calculate(c, job_context) for c in candidates],
+            "education": [self.education_metric.calculate(c, job_context) for c in candidates],
+            "language": [self.language_metric.calculate(c, job_context) for c in candidates],
+            # Fuzzy-match all certifications of the pool in one score matrix
+            "certification": self.certification_metric.calculate_batch(candidates, job_context),
+        }
+
+        # Score the semantic metric in one matrix product (missing summaries get embedded)
+        survivors = self._prune_candidates(
+            candidates, scores, weights, min_score, ("semantic", "experience")
+        )
+        scores["semantic"] = self._scatter_scores(
+            len(candidates),
+            survivors,
+            self.semantic_metric.calculate_batch([candidates[i] for i in survivors], job_context),
+        )
+
+        # Embed every responsibility of the survivors in bulk, then score it in one matmul
+        survivors = self._prune_candidates(
+            candidates, scores, weights, min_score, ("experience",), survivors
+        )
+        survivor_candidates = [candidates[i] for i in survivors]
+        responsibility_embeddings = self.experience_metric.precompute_candidate_embeddings(
+            survivor_candidates, job_context
+        )
+        scores["experience"] = self._scatter_scores(
+            len(candidates),
+            survivors,
+            self.experience_metric.calculate_batch(
+                survivor_candidates, job_context, responsibility_embeddings
+            ),
+        )
+
+        return [
+            self._calculate_similarity_with_context(
+                candidate,
+                job_context,
+                weights,
+                {metric: metric_scores[index] for metric, metric_scores in scores.items()},
+            )
+            for index, candidate in enumerate(candidates)
+        ]
+
     def calculate_similarity(
         self, candidate_id: int, job_id: int, weights: Optional[Dict[str, float]] = None
     ) -> SimilarityScore:
         """Calculate similarity score between candidate and job (single comparison)"""
-        job_context = self.preprocess_job(job_id)
-        return self._calculate_similarity_with_context(candidate_id, job_context, weights)
+        return self.calculate_similarity_batch([candidate_id], job_id, weights)[0]
+
+    @staticmethod
+    def _prune_candidates(
+        candidates: List[Dict],
+        scores: Dict[str, List[float]],
+        weights: Dict[str, float],
+        min_score: float,
+        pending_metrics: Tuple[str, ...],
+        indices: Optional[List[int]] = None,
+    ) -> List[int]:
+        """Indices of candidates that can still reach `min_score` if every pending metric is 1.0"""
+        if indices is None:
+            indices = list(range(len(candidates)))
+        if min_score <= 0:
+            return indices
+
+        total_weight = sum(weights.values())
+        headroom = sum(weights[metric] for metric in pending_metrics)
+        # Overall scores are rounded to 4 places, so leave that much slack on the bound
+        threshold = (min_score - 5e-5) * total_weight
+        survivors = [
+            index
+            for index in indices
+            if sum(weights[metric] * scores[metric][index] for metric in scores) + headroom
+            >= threshold
+        ]
+        if len(survivors) < len(indices):
+            logger.debug(
+                "Pruned {} of {} candidates before {}",
+                len(indices) - len(survivors),
+                len(indices),
+                ", ".join(pending_metrics),
+            )
+        return survivors
+
+    @staticmethod
+    def _scatter_scores(size: int, indices: List[int], values: List[float]) -> List[float]:
+        """Expand scores computed for a subset of the pool back to pool order, 0.0 elsewhere"""
+        expanded = [0.0] * size
+        for index, value in zip(indices, values):
+            expanded[index] = value
+        return expanded
+
+    def _attach_summary_embeddings(self, candidates: List[Dict]):
+        """Attach precomputed summary embeddings from the in-memory index to candidate dicts"""
+        embedded_ids, matrix = self.embedding_index.lookup(
+            [candidate["id"] for candidate in candidates]
+        )
+        summary_embeddings = dict(zip(embedded_ids, matrix))
+
+        for candidate in candidates:
+            if candidate["id"] in summary_embeddings:
+                candidate["summary_embedding"] = summary_embeddings[candidate["id"]]
 
     def _calculate_similarity_with_context(
         self,
-        candidate_id: int,
+        candidate: Dict,
         job_context: JobContext,
-        weights: Optional[Dict[str, float]] = None,
+        weights: Dict[str, float],
+        scores: Dict[str, float],
     ) -> SimilarityScore:
-        """Calculate similarity using preprocessed job context"""
-        # Default weights
-        if weights is None:
-            weights = {
-                "skills": 0.30,
-                "experience": 0.25,
-                "education": 0.15,
-                "language": 0.03,
-                "certification": 0.02,
-                "semantic": 0.05,
-                "seniority": 0.02,
-            }
-
-        # Fetch candidate data
-        candidate = CandidateService.get_candidate_by_id(candidate_id)
-        if not candidate:
-            logger.error(f"Could not find candidate {candidate_id}")
-            return self._create_empty_score()
-
-        logger.info(
-            f"Calculating similarity: {candidate.get('full_name', 'Unknown')} -> {job_context.job_data.get('job_title', 'Unknown')}"
+        """Combine the per-metric scores of one candidate into a weighted similarity score"""
+        logger.debug(
+            "Calculating similarity: {} -> {}",
+            candidate.get("full_name", "Unknown"),
+            job_context.job_data.get("job_title", "Unknown"),
         )
 
-        # Calculate individual scores using cached job context
-        skills_score = self.skills_metric.calculate(candidate, job_context)
-        experience_score = self.experience_metric.calculate(candidate, job_context)
-        education_score = self.education_metric.calculate(candidate, job_context)
-        language_score = self.language_metric.calculate(candidate, job_context)
-        certification_score = self.certification_metric.calculate(candidate, job_context)
-        semantic_score = self.semantic_metric.calculate(candidate, job_context)
-        seniority_score = self.seniority_metric.calculate(candidate, job_context)
+        skills_score = scores["skills"]
+        experience_score = scores["experience"]
+        education_score = scores["education"]
+        language_score = scores["language"]
+        certification_score = scores["certification"]
+        semantic_score = scores["semantic"]
+        seniority_score = scores["seniority"]
 
         # Calculate weighted overall score
         overall_score = (
@@ -138,7 +337,8 @@ class AdvancedSimilarityEngine:
         )
         overall_score /= sum(weights.values())
 
-        return SimilarityScore(
+        # Scores come straight from the metrics, so skip pydantic validation on this hot path
+        return SimilarityScore.model_construct(
             overall_score=round(overall_score, 4),
             skills_score=round(skills_score, 4),
             experience_score=round(experience_score, 4),
@@ -155,20 +355,24 @@ class AdvancedSimilarityEngine:
 
     def clear_cache(self, job_id: Optional[int] = None):
         """Clear cached job context for specific job or all jobs"""
+        with self._job_context_lock:
+            if job_id:
+                self._job_context_cache.pop(job_id, None)
+            else:
+                self._job_context_cache.clear()
         if job_id:
-            self._job_context_cache.pop(job_id, None)
             logger.info(f"Cleared cache for job {job_id}")
         else:
-            self._job_context_cache.clear()
             logger.info("Cleared all job context cache")
 
     def get_cached_job_ids(self) -> List[int]:
         """Get list of cached job IDs"""
-        return list(self._job_context_cache.keys())
+        with self._job_context_lock:
+            return list(self._job_context_cache.keys())
 
     def _create_empty_score(self) -> SimilarityScore:
         """Create empty similarity score for error cases"""
-        return SimilarityScore(
+        return SimilarityScore.model_construct(
             overall_score=0.0,
             skills_score=0.0,
             experience_score=0.0,
@@ -1,7 +1,7 @@
-from difflib import SequenceMatcher as SM
 from typing import Dict, List, Set
 
 from loguru import logger
+from rapidfuzz import fuzz, process
 
 from src.backend.similarity_engine.base_similarity_metric import BaseSimilarityMetric
 from src.backend.similarity_engine.data_models import JobContext
@@ -20,11 +20,11 @@ class SkillsSimilarityMetric(BaseSimilarityMetric):
             required_skills = job_context.required_skills
 
             if not required_skills:
-                logger.info("No required skills found for job")
+                logger.debug("No required skills found for job")
                 return 0.8
 
             if not candidate_skills:
-                logger.info("No skills found for candidate")
+                logger.debug("No skills found for candidate")
                 return 0.0
 
             matched_skills = self._fuzzy_match_skills(candidate_skills, required_skills)
@@ -35,8 +35,11 @@ class SkillsSimilarityMetric(BaseSimilarityMetric):
                 return 0.0
 
             jaccard_score = intersection_size / union_size
-            logger.info(
-                f"Skills similarity - Matched: {intersection_size}, Union: {union_size}, Jaccard: {jaccard_score:.4f}"
+            logger.debug(
+                "Skills similarity - Matched: {}, Union: {}, Jaccard: {:.4f}",
+                intersection_size,
+                union_size,
+                jaccard_score,
             )
             return min(jaccard_score, 1.0)
 
@@ -84,30 +87,21 @@ class SkillsSimilarityMetric(BaseSimilarityMetric):
     def _fuzzy_match_skills(
         self, candidate_skills: List[str], required_skills: List[str]
     ) -> Set[str]:
-        """Find fuzzy matches between candidate skills and required skills"""
-        matched_skills = set()
-
-        for required_skill in required_skills:
-            if required_skill in candidate_skills:
-                matched_skills.add(required_skill)
-                continue
-
-            best_match_ratio = 0
-            for candidate_skill in candidate_skills:
-                similarity = SM(None, required_skill, candidate_skill).ratio()
-                if similarity > best_match_ratio:
-                    best_match_ratio = similarity
-
-                if similarity >= self.threshold:
-                    matched_skills.add(required_skill)
-                    logger.debug(
-                        f"Fuzzy match found: '{required_skill}' <-> '{candidate_skill}' (similarity: {similarity:.3f})"
-                    )
-                    break
-
-            if required_skill not in matched_skills:
-                logger.debug(
-                    f"No match for required skill: '{required_skill}' (best similarity: {best_match_ratio:.3f})"
-                )
-
+        """Find fuzzy matches between candidate skills and required skills
+
+        All required x candidate ratios are scored in one rapidfuzz cdist call; a required
+        skill matches when its best ratio reaches the threshold (exact matches score 100).
+        """
+        scores = process.cdist(required_skills, candidate_skills, scorer=fuzz.ratio)
+        best_match_ratios = scores.max(axis=1) / 100.0
+        matched_skills = {
+            required_skill
+            for required_skill, best_match_ratio in zip(required_skills, best_match_ratios)
+            if best_match_ratio >= self.threshold
+        }
+        logger.debug(
+            "Fuzzy skill matching: {}/{} required skills matched",
+            len(matched_skills),
+            len(set(required_skills)),
+        )
         return matched_skills
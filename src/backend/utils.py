@@ -1,13 +1,16 @@
 import base64
+from functools import lru_cache
+import mmap
 import os
 from pathlib import Path
 import time
-from typing import List, Tuple
+from typing import List, Tuple, Union
 import uuid
 
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from loguru import logger
+import numpy as np
 
 from src.backend.config import settings
 from src.backend.models import FileInfo
@@ -24,6 +27,7 @@ def get_llm(model="gemini-2.5-flash", temperature=0.1) -> ChatGoogleGenerativeAI
     return llm
 
 
+@lru_cache(maxsize=None)
 def get_embedding_model(model="models/embedding-001") -> GoogleGenerativeAIEmbeddings:
     load_dotenv()
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -31,11 +35,30 @@ def get_embedding_model(model="models/embedding-001") -> GoogleGenerativeAIEmbed
     return embedding_model
 
 
+def serialize_embedding(embedding) -> bytes:
+    """Quantize an embedding to int8 with a per-vector float32 scale (stored first)"""
+    vector = np.asarray(embedding, dtype=np.float32)
+    scale = float(np.abs(vector).max(initial=0.0)) / 127.0 or 1.0
+    quantized = np.round(vector / scale).astype(np.int8)
+    return np.float32(scale).tobytes() + quantized.tobytes()
+
+
+def deserialize_embedding(blob: bytes) -> np.ndarray:
+    """Dequantize int8 embedding bytes back into a float32 vector"""
+    scale = np.frombuffer(blob, dtype=np.float32, count=1)[0]
+    return np.frombuffer(blob, dtype=np.int8, offset=4).astype(np.float32) * scale
+
+
 def encode_file_to_base64(file_path: str) -> str:
-    """Encode an image file to a base64 string."""
+    """Encode a file to a base64 string.
+
+    The file is memory-mapped rather than read, so only the encoded copy is held in memory.
+    """
     with open(file_path, "rb") as file:
-        encoded_string = base64.b64encode(file.read()).decode("utf-8")
-    return encoded_string
+        if os.fstat(file.fileno()).st_size == 0:
+            return ""  # mmap cannot map an empty file
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return base64.b64encode(mapped).decode("ascii")
 
 
 def get_file_type_extension(file_path: Path) -> Tuple[str, str]:
@@ -70,11 +93,24 @@ def create_file_info(file_path: Path) -> FileInfo:
     )
 
 
+def load_file_infos(file_paths: List[Path]) -> List[Union[FileInfo, Path]]:
+    """Read and encode every file once up front; files that cannot be read are returned
+    as paths, so the parser reports them as failed files"""
+    file_infos: List[Union[FileInfo, Path]] = []
+    for file_path in file_paths:
+        try:
+            file_infos.append(create_file_info(file_path))
+        except OSError:
+            file_infos.append(file_path)
+    return file_infos
+
+
 def create_batches(
     file_paths: List[Path], batch_size: int, max_size_mb: int = None
 ) -> List[List[Path]]:
     """
-    Create batches of files based on batch size and optional maximum total size per batch.
+    Pack files into as few batches as possible (first-fit decreasing by file size), so small
+    files fill up batches instead of each batch being cut at the next file in input order.
 
     Args:
         file_paths: List of file paths to batch
@@ -87,33 +123,35 @@ def create_batches(
     if not file_paths:
         return []
 
-    batches: List[List[Path]] = []
-    current_batch: List[Path] = []
-    current_batch_size_bytes = 0
     max_size_bytes = max_size_mb * 1024 * 1024 if max_size_mb else float("inf")
 
+    sized_files: List[Tuple[int, Path]] = []
     for file_path in file_paths:
         try:
-            file_size = get_file_size(file_path)
-
-            if (
-                len(current_batch) >= batch_size
-                or current_batch_size_bytes + file_size > max_size_bytes
-            ):
-                if current_batch:
-                    batches.append(current_batch)
-                    current_batch = []
-                    current_batch_size_bytes = 0
-
-            current_batch.append(file_path)
-            current_batch_size_bytes += file_size
-
+            sized_files.append((get_file_size(file_path), file_path))
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
-            continue
+    sized_files.sort(key=lambda sized_file: sized_file[0], reverse=True)
 
-    if current_batch:
-        batches.append(current_batch)
+    batches: List[List[Path]] = []
+    batch_sizes_bytes: List[int] = []
+    # Batches that can still take a file, so full ones are not scanned again
+    open_batches: List[int] = []
+
+    for file_size, file_path in sized_files:
+        for position, index in enumerate(open_batches):
+            if batch_sizes_bytes[index] + file_size <= max_size_bytes:
+                batches[index].append(file_path)
+                batch_sizes_bytes[index] += file_size
+                if len(batches[index]) >= batch_size:
+                    del open_batches[position]
+                break
+        else:
+            # A file larger than max_size_mb still gets a batch of its own
+            batches.append([file_path])
+            batch_sizes_bytes.append(file_size)
+            if batch_size > 1 and file_size < max_size_bytes:
+                open_batches.append(len(batches) - 1)
 
     logger.info(f"Created {len(batches)} batches from {len(file_paths)} files")
     return batches
@@ -139,10 +177,10 @@ def calculate_success_rate(successful: int, total: int) -> float:
 def filter_supported_files(file_paths: List[Path]) -> List[Path]:
     """Filter out unsupported file types"""
     supported_files = []
+    supported_extensions = settings.SUPPORTED_CV_FORMATS["all"]
 
     for file_path in file_paths:
-        file_type, _ = get_file_type_extension(file_path)
-        if file_type != "unknown":
+        if file_path.suffix.lower() in supported_extensions:
             supported_files.append(file_path)
         else:
             logger.warning(f"Skipping unsupported file: {file_path.name}")
@@ -0,0 +1,59 @@
+import pytest
+
+from src.backend.config import settings
+from src.backend.database import get_db_manager
+from src.backend.models import CVData, JobData
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Database manager on a fresh database file, used by every service for the test"""
+    monkeypatch.setattr(settings, "DATABASE_DIR", str(tmp_path / "test.db"))
+    get_db_manager.cache_clear()
+    yield get_db_manager()
+    get_db_manager.cache_clear()
+
+
+def make_cv(name: str = "Jane Doe") -> CVData:
+    return CVData(
+        full_name=name,
+        email=f"{name.lower().replace(' ', '.')}@example.com",
+        phone=None,
+        address=None,
+        linkedin=None,
+        github=None,
+        website=None,
+        summary="Backend engineer",
+        years_of_experience=5,
+        current_position="Engineer",
+        current_company="Acme",
+    )
+
+
+def make_job(job_id: str = "JOB-1") -> JobData:
+    return JobData(
+        job_title="Backend Engineer",
+        job_id=job_id,
+        department=None,
+        employment_type=None,
+        work_arrangement=None,
+        location=None,
+        company=None,
+        job_summary="Build APIs",
+        job_description=None,
+        salary_info=None,
+        application_deadline=None,
+        application_process=None,
+        contact_email=None,
+        contact_person=None,
+        travel_requirements=None,
+        security_clearance=None,
+        visa_sponsorship=None,
+        diversity_statement=None,
+        posted_date=None,
+        last_updated=None,
+        urgency_level=None,
+        seniority_level="Mid-level",
+        min_years_experience=3,
+        max_years_experience=None,
+    )
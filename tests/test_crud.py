@@ -0,0 +1,55 @@
+from src.backend.crud import CandidateService, JobService, MatchService
+
+from .conftest import make_cv, make_job
+
+
+def _match_count(db) -> int:
+    return db.execute_query("SELECT COUNT(*) FROM candidate_job_matches", fetch_one=True)[0]
+
+
+def test_delete_candidate_with_matches(db):
+    candidate_id = CandidateService.create_candidate(make_cv())["id"]
+    job_id = JobService.create_job(make_job())["id"]
+    MatchService.create_match(candidate_id, job_id, 0.8)
+
+    assert CandidateService.delete_candidate(candidate_id) is True
+    assert CandidateService.get_candidate_by_id(candidate_id) is None
+    assert _match_count(db) == 0
+    assert JobService.get_job(job_id) is not None
+
+
+def test_delete_job_with_matches(db):
+    candidate_id = CandidateService.create_candidate(make_cv())["id"]
+    job_id = JobService.create_job(make_job())["id"]
+    MatchService.create_match(candidate_id, job_id, 0.8)
+
+    assert JobService.delete_job(job_id) is True
+    assert JobService.get_job(job_id) is None
+    assert _match_count(db) == 0
+    assert CandidateService.get_candidate_by_id(candidate_id) is not None
+
+
+def test_embeddings_version_changes_on_every_write(db):
+    candidate_id = CandidateService.create_candidate(make_cv())["id"]
+    versions = [CandidateService.get_candidate_embeddings_version()]
+
+    CandidateService.save_candidate_embedding(candidate_id, b"first")
+    versions.append(CandidateService.get_candidate_embeddings_version())
+    # Replacing the vector keeps the row count and the largest candidate ID
+    CandidateService.save_candidate_embedding(candidate_id, b"second")
+    versions.append(CandidateService.get_candidate_embeddings_version())
+    # Deleting the candidate cascades to its embedding
+    CandidateService.delete_candidate(candidate_id)
+    versions.append(CandidateService.get_candidate_embeddings_version())
+
+    assert len(set(versions)) == len(versions)
+
+
+def test_deleted_ids_are_not_reused(db):
+    candidate_id = CandidateService.create_candidate(make_cv())["id"]
+    job_id = JobService.create_job(make_job())["id"]
+    CandidateService.delete_candidate(candidate_id)
+    JobService.delete_job(job_id)
+
+    assert CandidateService.create_candidate(make_cv())["id"] != candidate_id
+    assert JobService.create_job(make_job())["id"] != job_id
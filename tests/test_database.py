@@ -0,0 +1,29 @@
+from src.backend.crud import CandidateService
+from src.backend.database import DatabaseManager
+
+from .conftest import make_cv
+
+
+def test_table_version_changes_on_every_write(db):
+    versions = [db.table_version("candidates")]
+
+    candidate_id = CandidateService.create_candidate(make_cv())["id"]
+    versions.append(db.table_version("candidates"))
+    CandidateService.update_candidate(candidate_id, make_cv("John Doe"))
+    versions.append(db.table_version("candidates"))
+    CandidateService.delete_candidate(candidate_id)
+    versions.append(db.table_version("candidates"))
+
+    assert len(set(versions)) == len(versions)
+
+
+def test_table_version_sees_writes_from_other_processes(db):
+    before = db.table_version("job_descriptions")
+
+    # A second manager on the same file stands in for the ingest process
+    other = DatabaseManager(db.db_path)
+    other.execute_query(
+        "INSERT INTO job_descriptions (job_title, job_id) VALUES (?, ?)", ("Engineer", "J-1")
+    )
+
+    assert db.table_version("job_descriptions") != before